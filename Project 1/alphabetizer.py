@@ -2,6 +2,14 @@
 Algorithm to sort a list of People alphabetically
 Can sort by first or last name
 """
+import random
+import time
+import unicodedata
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice, repeat
+from operator import lt
 class Person:
     """
     Class for elements of data
@@ -9,6 +17,7 @@ class Person:
     Person.last is last  name
     Person.email is their email
     """
+    __slots__ = ('first', 'last', 'email')
     def __init__(self, first, last, email):
         self.first = first
         self.last = last
@@ -19,6 +28,58 @@ class Person:
         return '({0}, {1}, {2})'.format(self.first, self.last, self.email)
     def __eq__(self, other):
         return self.first == other.first and self.last == other.last and self.email == other.email
+class ColumnRoster:
+    """
+    A roster stored as parallel lists instead of one object per person
+    ColumnRoster.first, .last and .email are the columns
+    ColumnRoster.order is the permutation of rows giving the roster order
+    """
+    def __init__(self, members=()):
+        self.first = []
+        self.last = []
+        self.email = []
+        self.order = array('l')
+        for member in members:
+            self.add(member.first, member.last, member.email)
+    def add(self, first, last, email):
+        """
+        Adds a person to the end of the roster
+        :param first: first name
+        :param last: last name
+        :param email: email
+        """
+        self.order.append(len(self.first))
+        self.first.append(first)
+        self.last.append(last)
+        self.email.append(email)
+    def row(self, i):
+        """
+        Builds a Person from a row of the columns
+        :param i: a row number, not a position in the roster order
+        :return: a Person
+        """
+        return Person(self.first[i], self.last[i], self.email[i])
+    def permuted(self, order):
+        """
+        Makes a roster sharing these columns in a different order
+        :param order: an iterable of row numbers
+        :return: a ColumnRoster
+        """
+        roster = ColumnRoster()
+        roster.first = self.first
+        roster.last = self.last
+        roster.email = self.email
+        roster.order = array('l', order)
+        return roster
+    def __len__(self):
+        return len(self.order)
+    def __getitem__(self, i):
+        return self.row(self.order[i])
+    def __iter__(self):
+        for i in self.order:
+            yield self.row(i)
+    def __repr__(self):
+        return 'ColumnRoster([{0}])'.format(', '.join(repr(member) for member in self))
 def merge(left, right, ordering):
     """
     Merges two lists in alphabetical order
@@ -29,19 +90,22 @@ def merge(left, right, ordering):
     """
     merged = []
     count = 0
-    while left and right:
+    i = 0
+    j = 0
+    #walk both lists with cursors instead of popping from the front
+    while i < len(left) and j < len(right):
         #count of number of comparisons made
         count += 1
         #Get the correct name from either side
-        if ordering(left[0], right[0]):
-            merged.append(left.pop(0))
+        if ordering(left[i], right[j]):
+            merged.append(left[i])
+            i += 1
         else:
-            merged.append(right.pop(0))
+            merged.append(right[j])
+            j += 1
     #Add remaining names to the merged list
-    if left:
-        merged += left
-    if right:
-        merged += right
+    merged.extend(left[i:])
+    merged.extend(right[j:])
     #the merged list and count
     return merged, count
 def merge_sort(roster, ordering):
@@ -64,6 +128,210 @@ def merge_sort(roster, ordering):
     count += l_count + r_count + m_count
     #the merged list and count
     return merged_list, count
+def merge_runs(source, target, low, mid, high, ordering):
+    """
+    Merges the sorted runs source[low:mid] and source[mid:high] into target[low:high]
+    :param source: a list of People holding the two runs
+    :param target: a list of the same length to merge into
+    :param low: start of the first run
+    :param mid: end of the first run and start of the second
+    :param high: end of the second run
+    :param ordering: a function that orders two People
+    :return: the number of comparisons made
+    """
+    count = 0
+    i = low
+    j = mid
+    k = low
+    while i < mid and j < high:
+        count += 1
+        #take from the second run only when it is strictly first, keeps the sort stable
+        if ordering(source[j], source[i]):
+            target[k] = source[j]
+            j += 1
+        else:
+            target[k] = source[i]
+            i += 1
+        k += 1
+    #Copy whichever run is left over
+    if i < mid:
+        target[k:high] = source[i:mid]
+    else:
+        target[k:high] = source[j:high]
+    return count
+def merge_sort_bottom_up(roster, ordering):
+    """
+    Sorts roster with an iterative merge sort that ping-pongs between two buffers
+    :param roster: a list of People
+    :param ordering: a function that orders two People
+    :return: a sorted version of roster and the number of comparisons made
+    """
+    count = 0
+    length = len(roster)
+    source = list(roster)
+    target = [None] * length
+    width = 1
+    #merge runs of width 1, 2, 4, ... until a single run is left
+    while width < length:
+        for low in range(0, length, 2 * width):
+            mid = min(low + width, length)
+            high = min(low + 2 * width, length)
+            count += merge_runs(source, target, low, mid, high, ordering)
+        source, target = target, source
+        width *= 2
+    return source, count
+MIN_GALLOP = 7
+MIN_RUN = 32
+def gallop(items, low, high, condition):
+    """
+    Finds where condition stops holding in items[low:high] by exponential then binary search
+    condition must hold for a prefix of the range and fail for the rest
+    :param items: a list
+    :param low: start of the range
+    :param high: end of the range
+    :param condition: a function of one element
+    :return: the first index where condition fails (or high) and the number of comparisons made
+    """
+    count = 0
+    step = 1
+    #condition holds on items[low:start] and fails from end on
+    start = low
+    end = high
+    probe = low
+    while probe < high:
+        count += 1
+        if not condition(items[probe]):
+            end = probe
+            break
+        start = probe + 1
+        step *= 2
+        probe = low + step - 1
+    #binary search the last gap
+    position, b_count = gallop_binary(items, start, end, condition)
+    return position, count + b_count
+def gallop_binary(items, start, end, condition):
+    """
+    Finds where condition stops holding in items[start:end] by binary search
+    condition must hold for a prefix of the range and fail for the rest
+    :param items: a list
+    :param start: start of the range
+    :param end: end of the range
+    :param condition: a function of one element
+    :return: the first index where condition fails (or end) and the number of comparisons made
+    """
+    count = 0
+    while start < end:
+        mid = (start + end) // 2
+        count += 1
+        if condition(items[mid]):
+            start = mid + 1
+        else:
+            end = mid
+    return start, count
+def merge_galloping(left, right, ordering):
+    """
+    Merges two adjacent sorted runs, galloping when one side keeps winning
+    Ties go to left, so left must be the earlier run
+    :param left: a sorted list of People
+    :param right: a sorted list of People
+    :param ordering: a function that orders two People
+    :return: a merged list and the number of comparisons made
+    """
+    #people of left not after right[0] are already in place
+    i, count = gallop(left, 0, len(left), lambda a: not ordering(right[0], a))
+    if i == len(left):
+        return left + right, count
+    #people of right not before left[-1] stay at the end
+    right_end, r_count = gallop(right, 0, len(right), lambda b: ordering(b, left[-1]))
+    count += r_count
+    merged = left[:i]
+    j = 0
+    left_wins = 0
+    right_wins = 0
+    while i < len(left) and j < right_end:
+        count += 1
+        if ordering(right[j], left[i]):
+            merged.append(right[j])
+            j += 1
+            right_wins += 1
+            left_wins = 0
+        else:
+            merged.append(left[i])
+            i += 1
+            left_wins += 1
+            right_wins = 0
+        #one side dominates, copy its whole stretch at once
+        if left_wins >= MIN_GALLOP and j < right_end:
+            end, g_count = gallop(left, i, len(left), lambda a: not ordering(right[j], a))
+            merged.extend(left[i:end])
+            i = end
+            count += g_count
+            left_wins = 0
+        elif right_wins >= MIN_GALLOP and i < len(left):
+            end, g_count = gallop(right, j, right_end, lambda b: ordering(b, left[i]))
+            merged.extend(right[j:end])
+            j = end
+            count += g_count
+            right_wins = 0
+    merged.extend(left[i:])
+    merged.extend(right[j:])
+    return merged, count
+def natural_merge_sort(roster, ordering):
+    """
+    Sorts roster by merging the runs it already contains
+    Strictly descending runs are reversed, so sorted or reversed input costs n - 1 comparisons
+    :param roster: a list of People
+    :param ordering: a function that orders two People
+    :return: a sorted version of roster and the number of comparisons made
+    """
+    count = 0
+    runs = []
+    start = 0
+    while start < len(roster):
+        end = start + 1
+        if end < len(roster):
+            count += 1
+            if ordering(roster[end], roster[start]):
+                #strictly descending run
+                end += 1
+                while end < len(roster):
+                    count += 1
+                    if not ordering(roster[end], roster[end - 1]):
+                        break
+                    end += 1
+                run = roster[start:end][::-1]
+            else:
+                end += 1
+                while end < len(roster):
+                    count += 1
+                    if ordering(roster[end], roster[end - 1]):
+                        break
+                    end += 1
+                run = roster[start:end]
+        else:
+            run = roster[start:end]
+        #grow short runs with binary insertion so random input is not all tiny runs
+        while len(run) < MIN_RUN and end < len(roster):
+            person = roster[end]
+            position, i_count = gallop_binary(run, 0, len(run), lambda a: not ordering(person, a))
+            run.insert(position, person)
+            count += i_count
+            end += 1
+        runs.append(run)
+        start = end
+    if not runs:
+        return [], count
+    #merge neighbouring runs until one is left
+    while len(runs) > 1:
+        merged_runs = []
+        for i in range(0, len(runs) - 1, 2):
+            merged, m_count = merge_galloping(runs[i], runs[i + 1], ordering)
+            merged_runs.append(merged)
+            count += m_count
+        if len(runs) % 2:
+            merged_runs.append(runs[-1])
+        runs = merged_runs
+    return runs[0], count
 def order_first_name(a, b):
     """
     Orders two people by their first names
@@ -84,26 +352,547 @@ def order_last_name(a, b):
     if (a.last < b.last) or (a.last == b.last and a.first < b.first):
         return True
     return False
-def is_alphabetized(roster, ordering):
+def key_first_name(a):
+    """
+    Sort key that orders people by their first names
+    :param a: a Person
+    :return: a tuple that sorts the same way as order_first_name
+    """
+    return (a.first, a.last)
+def key_last_name(a):
+    """
+    Sort key that orders people by their last names
+    :param a: a Person
+    :return: a tuple that sorts the same way as order_last_name
+    """
+    return (a.last, a.first)
+@lru_cache(maxsize=2**16)
+def collate(name):
+    """
+    Folds a name so it compares without regard to case or accents
+    Results are cached, so repeated names are only normalized once
+    :param name: a string
+    :return: the name decomposed, without combining marks, and case folded
+    """
+    if name.isascii():
+        return name.lower()
+    decomposed = unicodedata.normalize('NFKD', name)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+def collated_first_name(a):
+    """
+    Sort key that orders people by their first names, ignoring case and accents
+    The original names break ties so the order is still total
+    :param a: a Person
+    :return: a tuple of strings
+    """
+    return (collate(a.first), collate(a.last), a.first, a.last)
+def collated_last_name(a):
+    """
+    Sort key that orders people by their last names, ignoring case and accents
+    The original names break ties so the order is still total
+    :param a: a Person
+    :return: a tuple of strings
+    """
+    return (collate(a.last), collate(a.first), a.last, a.first)
+def order_first_name_collated(a, b):
+    """
+    Orders two people by their first names, ignoring case and accents
+    alphabetize uses collated_first_name instead, so names are folded once per person
+    :param a: a Person
+    :param b: a Person
+    :return: True if a comes before b alphabetically and False otherwise
+    """
+    return collated_first_name(a) < collated_first_name(b)
+def order_last_name_collated(a, b):
+    """
+    Orders two people by their last names, ignoring case and accents
+    alphabetize uses collated_last_name instead, so names are folded once per person
+    :param a: a Person
+    :param b: a Person
+    :return: True if a comes before b alphabetically and False otherwise
+    """
+    return collated_last_name(a) < collated_last_name(b)
+class OrderingKey:
+    """
+    Wraps a Person so an ordering function can be used as a sort key
+    """
+    __slots__ = ('person', 'ordering')
+    def __init__(self, person, ordering):
+        self.person = person
+        self.ordering = ordering
+    def __lt__(self, other):
+        return self.ordering(self.person, other.person)
+def key_from_ordering(ordering):
+    """
+    Adapts an ordering function into a key function
+    :param ordering: a function that orders two People
+    :return: a function mapping a Person to a one item key tuple
+    """
+    def key(a):
+        return (OrderingKey(a, ordering),)
+    return key
+ORDERING_KEYS = {
+    order_first_name: key_first_name,
+    order_last_name: key_last_name,
+    order_first_name_collated: collated_first_name,
+    order_last_name_collated: collated_last_name,
+}
+def column_keys(roster, key):
+    """
+    Builds the known sort keys of every row straight from a ColumnRoster's columns
+    :param roster: a ColumnRoster
+    :param key: a key function
+    :return: a list of key tuples indexed by row number, or None if key is not a known one
+    """
+    first = roster.first
+    last = roster.last
+    if key is key_first_name:
+        return list(zip(first, last))
+    if key is key_last_name:
+        return list(zip(last, first))
+    if key is collated_first_name:
+        return list(zip(map(collate, first), map(collate, last), first, last))
+    if key is collated_last_name:
+        return list(zip(map(collate, last), map(collate, first), last, first))
+    return None
+class SortedRoster:
+    """
+    A roster that stays alphabetized as people are added and removed
+    People are kept in sorted buckets of about BUCKET_SIZE, so finding a spot is a
+    binary search over the buckets and then within one, and only that bucket shifts
+    People that order equally keep the order they were added in
+    """
+    BUCKET_SIZE = 512
+    def __init__(self, ordering, members=()):
+        """
+        :param ordering: a function that orders two People
+        :param members: people to start with
+        """
+        self.ordering = ordering
+        self.buckets = []
+        self.length = 0
+        self.insert_many(members)
+    def __len__(self):
+        return self.length
+    def __iter__(self):
+        for bucket in self.buckets:
+            yield from bucket
+    def __contains__(self, person):
+        return self.find(person) is not None
+    def __repr__(self):
+        return 'SortedRoster([{0}])'.format(', '.join(repr(member) for member in self))
+    def insert(self, person):
+        """
+        Adds a person after everyone that does not come after them
+        :param person: a Person
+        """
+        ordering = self.ordering
+        self.length += 1
+        if not self.buckets:
+            self.buckets.append([person])
+            return
+        #first bucket whose last person comes after person, or the last bucket
+        b, _ = gallop_binary(self.buckets, 0, len(self.buckets) - 1,
+                             lambda bucket: not ordering(person, bucket[-1]))
+        bucket = self.buckets[b]
+        i, _ = gallop_binary(bucket, 0, len(bucket), lambda a: not ordering(person, a))
+        bucket.insert(i, person)
+        if len(bucket) > 2 * self.BUCKET_SIZE:
+            self.buckets[b:b + 1] = [bucket[:self.BUCKET_SIZE], bucket[self.BUCKET_SIZE:]]
+    def insert_many(self, people):
+        """
+        Adds a batch of people
+        Large batches are sorted and merged in one pass instead of inserted one by one
+        :param people: an iterable of People
+        """
+        people = list(people)
+        if len(people) * 16 < self.length:
+            for person in people:
+                self.insert(person)
+            return
+        batch, _ = natural_merge_sort(people, self.ordering)
+        #the batch goes second so ties keep the people already here first
+        merged, _ = merge_galloping(list(self), batch, self.ordering)
+        self.buckets = [merged[i:i + self.BUCKET_SIZE] for i in range(0, len(merged), self.BUCKET_SIZE)]
+        self.length = len(merged)
+    def find(self, person):
+        """
+        Finds where a person equal to person is stored
+        :param person: a Person
+        :return: a (bucket, index) pair or None if they are not in the roster
+        """
+        ordering = self.ordering
+        #first bucket whose last person does not come before person
+        b, _ = gallop_binary(self.buckets, 0, len(self.buckets),
+                             lambda bucket: ordering(bucket[-1], person))
+        while b < len(self.buckets):
+            bucket = self.buckets[b]
+            i, _ = gallop_binary(bucket, 0, len(bucket), lambda a: ordering(a, person))
+            #check everyone that orders equally, they may run into the next bucket
+            while i < len(bucket):
+                if bucket[i] == person:
+                    return b, i
+                if ordering(person, bucket[i]):
+                    return None
+                i += 1
+            b += 1
+        return None
+    def remove(self, person):
+        """
+        Removes a person equal to person
+        :param person: a Person
+        :return: True if someone was removed and False otherwise
+        """
+        found = self.find(person)
+        if found is None:
+            return False
+        b, i = found
+        bucket = self.buckets[b]
+        del bucket[i]
+        if not bucket:
+            del self.buckets[b]
+        elif len(bucket) < self.BUCKET_SIZE // 2 and b + 1 < len(self.buckets):
+            #join small buckets with the next one so they do not pile up
+            bucket.extend(self.buckets.pop(b + 1))
+            if len(bucket) > 2 * self.BUCKET_SIZE:
+                self.buckets[b:b + 1] = [bucket[:self.BUCKET_SIZE], bucket[self.BUCKET_SIZE:]]
+        self.length -= 1
+        return True
+    def remove_many(self, people):
+        """
+        Removes a batch of people
+        :param people: an iterable of People
+        :return: the number of people removed
+        """
+        return sum(self.remove(person) for person in people)
+RADIX_FIELDS = {
+    order_first_name: ('first', 'last'),
+    order_last_name: ('last', 'first'),
+}
+RADIX_CUTOFF = 16
+def radix_strings(roster, ordering):
+    """
+    Builds one string per person that sorts like ordering, for radix_sort
+    Fields are joined with a NUL, which sorts before any character in a name
+    :param roster: a list of People, or of key tuples ending in an index when ordering is lt
+    :param ordering: order_first_name, order_last_name or lt
+    :return: a list of strings
+    """
+    if ordering is lt:
+        try:
+            return ['\0'.join(item[:-1]) for item in roster]
+        except TypeError:
+            raise ValueError('radix_sort needs keys made of strings')
+    if ordering not in RADIX_FIELDS:
+        raise ValueError('radix_sort needs one of the RADIX_FIELDS orderings')
+    major, minor = RADIX_FIELDS[ordering]
+    return [getattr(a, major) + '\0' + getattr(a, minor) for a in roster]
+def radix_sort(roster, ordering):
+    """
+    Sorts roster with a most significant digit first radix sort over the name characters
+    Groups of at most RADIX_CUTOFF people are finished with binary insertion using ordering,
+    and only those comparisons are counted
+    :param roster: a list of People
+    :param ordering: order_first_name, order_last_name or lt on key tuples of strings
+    :return: a sorted version of roster and the number of comparisons made
+    """
+    strings = radix_strings(roster, ordering)
+    count = 0
+    result = []
+    #groups of positions in roster that share the first depth characters, last group on top
+    stack = [(list(range(len(roster))), 0)]
+    while stack:
+        group, depth = stack.pop()
+        if len(group) <= RADIX_CUTOFF:
+            run = []
+            for i in group:
+                position, i_count = gallop_binary(run, 0, len(run), lambda a: not ordering(roster[i], a))
+                run.insert(position, roster[i])
+                count += i_count
+            result.extend(run)
+            continue
+        #skip over a prefix every string in the group shares, e.g. a common surname
+        group_strings = [strings[i] for i in group]
+        low = min(group_strings)
+        high = max(group_strings)
+        while depth < len(low) and low[depth] == high[depth]:
+            depth += 1
+        if depth == len(low) and low == high:
+            result.extend(roster[i] for i in group)
+            continue
+        #strings that end here come first, the rest are bucketed by their next character
+        buckets = {}
+        for i in group:
+            string = strings[i]
+            if len(string) == depth:
+                result.append(roster[i])
+            else:
+                bucket = buckets.get(string[depth])
+                if bucket is None:
+                    buckets[string[depth]] = [i]
+                else:
+                    bucket.append(i)
+        for character in sorted(buckets, reverse=True):
+            stack.append((buckets[character], depth + 1))
+    return result, count
+def is_pair_alphabetized(a, b, ordering, key=None):
+    """
+    Checks whether two neighbouring people are in order
+    :param a: a Person
+    :param b: the Person after a
+    :param ordering: a function comparing two elements
+    :param key: a function mapping a person to a sort key, used instead of ordering
+    :return: True if a may come before b and False otherwise
+    """
+    if key is not None:
+        return not key(b) < key(a)
+    return a == b or ordering(a, b)
+def is_alphabetized(roster, ordering, key=None, sample=None, batch_size=2**10):
     """
     Checks whether the roster of names is alphabetized in the given order
+    With key, the keys of batch_size people at a time are compared in one pass, and
+    people whose keys tie count as in order
+    With sample, only that many random neighbouring pairs are checked, so True only
+    means the roster is probably alphabetized
     :param roster: a list of people
     :param ordering: a function comparing two elements
+    :param key: a function mapping a person to a sort key, used instead of ordering
+    :param sample: the number of pairs to check, or None to check them all
+    :param batch_size: the number of keys computed at a time
     :return: True if the roster is alphabetized and False otherwise
     """
+    if sample is not None and sample < len(roster) - 1:
+        for i in random.sample(range(1, len(roster)), sample):
+            if not is_pair_alphabetized(roster[i-1], roster[i], ordering, key):
+                return False
+        return True
+    if key is not None:
+        people = iter(roster)
+        keys = []
+        while True:
+            batch = list(map(key, islice(people, batch_size)))
+            if not batch:
+                return True
+            #carry the last key over so pairs across batches are checked
+            keys = keys[-1:] + batch
+            #any key smaller than the one before it
+            if any(map(lt, islice(keys, 1, None), keys)):
+                return False
     for i in range(1, len(roster)):
         if roster[i-1] == roster[i]:
             continue
         elif not ordering(roster[i-1], roster[i]): #if not ordered
             return False
     return True
-def alphabetize(roster, ordering):
+COLLATED_ORDERINGS = (order_first_name_collated, order_last_name_collated)
+SORT_METHODS = {
+    'merge': merge_sort,
+    'bottom_up': merge_sort_bottom_up,
+    'adaptive': natural_merge_sort,
+    'radix': radix_sort,
+}
+def parallel_merge_sort(roster, ordering, method='merge', workers=2):
+    """
+    Sorts partitions of roster in worker processes and merges them in this one
+    ordering must be picklable, e.g. a module level function
+    :param roster: a list of People
+    :param ordering: a function that orders two People
+    :param method: the sort the workers use, a key of SORT_METHODS
+    :param workers: the number of worker processes
+    :return: a sorted version of roster and the number of comparisons made
+    """
+    size = max(1, -(-len(roster) // workers))
+    partitions = [roster[i:i + size] for i in range(0, len(roster), size)]
+    if len(partitions) <= 1:
+        return SORT_METHODS[method](roster, ordering)
+    with ProcessPoolExecutor(workers) as executor:
+        results = list(executor.map(SORT_METHODS[method], partitions, repeat(ordering)))
+    runs = [run for run, _ in results]
+    count = sum(cost for _, cost in results)
+    #merge neighbouring runs until one is left
+    while len(runs) > 1:
+        merged_runs = []
+        for i in range(0, len(runs) - 1, 2):
+            #the later run goes first so ties keep the earlier run's people first
+            merged, m_count = merge(runs[i + 1], runs[i], ordering)
+            merged_runs.append(merged)
+            count += m_count
+        if len(runs) % 2:
+            merged_runs.append(runs[-1])
+        runs = merged_runs
+    return runs[0], count
+class SortProfile:
+    """
+    Records where the work of a merge sort goes, level by level
+    SortProfile.levels[d] holds the totals for the calls at recursion depth d
+    """
+    FIELDS = ('calls', 'comparisons', 'moves', 'allocations', 'seconds')
+    def __init__(self):
+        self.levels = []
+    def level(self, depth):
+        """
+        Gets the totals for a recursion depth
+        :param depth: the depth, 0 for the first call
+        :return: a dictionary of FIELDS
+        """
+        while len(self.levels) <= depth:
+            self.levels.append(dict.fromkeys(self.FIELDS, 0))
+        return self.levels[depth]
+    def report(self):
+        """
+        Summarizes the profile
+        :return: a dictionary with the totals, the deepest recursion and a copy of every level
+        """
+        totals = {field: sum(level[field] for level in self.levels) for field in self.FIELDS}
+        totals['max_depth'] = len(self.levels) - 1
+        totals['levels'] = [dict(level, depth=depth) for depth, level in enumerate(self.levels)]
+        return totals
+def profiled_merge_sort(roster, ordering, profile, depth=0):
+    """
+    The same sort as merge_sort, recording its work in profile
+    Moves count elements copied into new lists, allocations count new lists and
+    seconds count time spent at this depth, not in deeper calls
+    :param roster: a list of People
+    :param ordering: a function that orders two People
+    :param profile: a SortProfile
+    :param depth: the recursion depth of this call
+    :return: a sorted version of roster and the number of comparisons made
+    """
+    start = time.perf_counter()
+    level = profile.level(depth)
+    level['calls'] += 1
+    if len(roster) <= 1:
+        level['seconds'] += time.perf_counter() - start
+        return roster, 0
+    back = roster[len(roster)//2:]
+    front = roster[:len(roster)//2]
+    level['moves'] += len(roster)
+    level['allocations'] += 2
+    level['seconds'] += time.perf_counter() - start
+    left, l_count = profiled_merge_sort(back, ordering, profile, depth + 1)
+    right, r_count = profiled_merge_sort(front, ordering, profile, depth + 1)
+    start = time.perf_counter()
+    merged_list, m_count = merge(left, right, ordering)
+    level['comparisons'] += m_count
+    level['moves'] += len(merged_list)
+    level['allocations'] += 1
+    level['seconds'] += time.perf_counter() - start
+    return merged_list, l_count + r_count + m_count
+def sort_with(roster, ordering, method, workers, profile=None):
+    """
+    Runs the sort chosen by alphabetize
+    :param roster: a list to sort
+    :param ordering: a function that orders two elements
+    :param method: the sort to use, a key of SORT_METHODS
+    :param workers: the number of processes to sort with
+    :param profile: a SortProfile to record the sort in, or None
+    :return: a sorted version of roster and the number of comparisons made
+    """
+    if profile is not None:
+        if method != 'merge' or workers > 1:
+            raise ValueError('Only a single process merge sort can be profiled')
+        return profiled_merge_sort(roster, ordering, profile)
+    if workers > 1:
+        return parallel_merge_sort(roster, ordering, method, workers)
+    return SORT_METHODS[method](roster, ordering)
+def alphabetize(roster, ordering, method='merge', key=None, workers=1, profile=None):
     """
     Alphabetizes the roster according to the given ordering
-    :param roster: a list of people
+    A ColumnRoster is sorted by permuting its row order, the people are never moved
+    The collated orderings always sort on their keys so names are folded once per person
+    :param roster: a list of people or a ColumnRoster
     :param ordering: a function comparing two elements
+    :param method: the sort to use, a key of SORT_METHODS
+    :param key: a function mapping a person to a tuple sort key, used instead of ordering
+    :param workers: the number of processes to sort with, see parallel_merge_sort
+    :param profile: a SortProfile to record a 'merge' sort in, or None
     :return: a sorted version of roster
     :return: the number of comparisons made
     """
-    roster, count = merge_sort(roster, ordering)
-    return (list(roster), count)
+    if method not in SORT_METHODS:
+        raise ValueError('Unknown sort method: {0}'.format(method))
+    if key is None and ordering in COLLATED_ORDERINGS:
+        key = ORDERING_KEYS[ordering]
+    if isinstance(roster, ColumnRoster):
+        if key is None:
+            key = ORDERING_KEYS.get(ordering) or key_from_ordering(ordering)
+        keys = column_keys(roster, key)
+        if keys is None:
+            decorated = [key(roster.row(i)) + (i,) for i in roster.order]
+        else:
+            decorated = [keys[i] + (i,) for i in roster.order]
+        decorated, count = sort_with(decorated, lt, method, workers, profile)
+        return (roster.permuted(item[-1] for item in decorated), count)
+    if key is None:
+        result, count = sort_with(roster, ordering, method, workers, profile)
+        #the sorts return a new list, except merge sort hands back a roster of at most one person
+        if result is roster:
+            result = list(roster)
+        return (result, count)
+    #compute every key once, the trailing index breaks ties and points back to the person
+    decorated = [key(person) + (i,) for i, person in enumerate(roster)]
+    decorated, count = sort_with(decorated, lt, method, workers, profile)
+    return ([roster[item[-1]] for item in decorated], count)
+def first_k(roster, ordering, k):
+    """
+    Finds the first k people of the roster in the given order without sorting all of it
+    Keeps the k best people seen so far in a heap with the latest of them on top
+    :param roster: a list of people
+    :param ordering: a function comparing two elements
+    :param k: how many people to return
+    :return: the first k people in the same order alphabetize would give
+    :return: the number of comparisons made
+    """
+    count = 0
+    def after(a, b):
+        #a and b are (position, person), ties go by position like a stable sort
+        nonlocal count
+        count += 1
+        if ordering(b[1], a[1]):
+            return True
+        count += 1
+        if ordering(a[1], b[1]):
+            return False
+        return a[0] > b[0]
+    def sift_up(heap, i):
+        while i > 0:
+            parent = (i - 1) // 2
+            if not after(heap[i], heap[parent]):
+                break
+            heap[i], heap[parent] = heap[parent], heap[i]
+            i = parent
+    def sift_down(heap, i):
+        while True:
+            latest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap) and after(heap[child], heap[latest]):
+                    latest = child
+            if latest == i:
+                break
+            heap[i], heap[latest] = heap[latest], heap[i]
+            i = latest
+    heap = []
+    if k > 0:
+        for item in enumerate(roster):
+            if len(heap) < k:
+                heap.append(item)
+                sift_up(heap, len(heap) - 1)
+            elif after(heap[0], item):
+                heap[0] = item
+                sift_down(heap, 0)
+    #back in roster order, a stable sort then matches alphabetize
+    heap.sort()
+    first, m_count = merge_sort([person for _, person in heap], ordering)
+    return first, count + m_count
+def page(roster, ordering, number, size):
+    """
+    Finds one page of the roster in the given order
+    :param roster: a list of people
+    :param ordering: a function comparing two elements
+    :param number: the page number, starting from 0
+    :param size: the number of people on a page
+    :return: the people on the page
+    :return: the number of comparisons made
+    """
+    first, count = first_k(roster, ordering, (number + 1) * size)
+    return first[number * size:], count
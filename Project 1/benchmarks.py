@@ -0,0 +1,311 @@
+#!/usr/bin/python3
+"""
+Benchmarks for the alphabetizer
+Run with a list of roster sizes, e.g. python3 benchmarks.py 100000 1000000 10000000
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from alphabetizer import *
+from main import load_file, load_file_bulk, write_file, write_file_bulk
+
+FIRST_NAMES = ['Harry', 'Hermione', 'Ron', 'Ginny', 'Fred', 'George', 'Percy', 'Neville',
+               'Dean', 'Seamus', 'Lavender', 'Parvati', 'Oliver', 'Katie', 'Angelina', 'Lee']
+LAST_NAMES = ['Potter', 'Granger', 'Weasley', 'Longbottom', 'Thomas', 'Finnigan', 'Brown',
+              'Patil', 'Wood', 'Bell', 'Johnson', 'Jordan', 'Creevey', 'Spinnet', 'McLaggen']
+
+def make_roster(n, seed=331):
+    """
+    Builds a random roster of people
+    :param n: the number of people
+    :param seed: seed for the random generator
+    :return: a list of People
+    """
+    rng = random.Random(seed)
+    roster = []
+    for i in range(n):
+        first = rng.choice(FIRST_NAMES) + str(rng.randrange(n))
+        last = rng.choice(LAST_NAMES)
+        roster.append(Person(first, last, '{0}{1}@hogwarts.edu'.format(first[0].lower(), i)))
+    return roster
+
+class DictPerson:
+    """
+    The old Person with a per-instance __dict__, kept for comparison
+    """
+    def __init__(self, first, last, email):
+        self.first = first
+        self.last = last
+        self.email = email
+
+def pop_merge(left, right, ordering):
+    """
+    The old merge that drains both lists with pop(0), kept for comparison
+    :param left: a list of People
+    :param right: a list of People
+    :param ordering: a function that orders two People
+    :return: a merged list and a count of the comparisons
+    """
+    merged = []
+    count = 0
+    while left and right:
+        count += 1
+        if ordering(left[0], right[0]):
+            merged.append(left.pop(0))
+        else:
+            merged.append(right.pop(0))
+    merged += left
+    merged += right
+    return merged, count
+
+def timed(function, *args):
+    """
+    Times a single call
+    :param function: the function to call
+    :param args: arguments for the function
+    :return: the seconds taken and the function's result
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def bench_merge(sizes):
+    """
+    Times one top level merge and a full alphabetize for each roster size
+    :param sizes: a list of roster sizes
+    """
+    print('{0:>10} {1:>12} {2:>12} {3:>12} {4:>14}'.format(
+        'n', 'merge (s)', 'pop(0) (s)', 'sort (s)', 'comparisons'))
+    for n in sizes:
+        roster = make_roster(n)
+        half = n // 2
+        left, _ = alphabetize(roster[:half], order_first_name)
+        right, _ = alphabetize(roster[half:], order_first_name)
+        merge_time, _ = timed(merge, left, right, order_first_name)
+        #pop(0) is quadratic, only run it where it finishes
+        if n <= 200000:
+            pop_time, _ = timed(pop_merge, list(left), list(right), order_first_name)
+            pop_time = '{0:.3f}'.format(pop_time)
+        else:
+            pop_time = '-'
+        sort_time, (_, count) = timed(alphabetize, roster, order_first_name)
+        print('{0:>10} {1:>12.3f} {2:>12} {3:>12.3f} {4:>14}'.format(
+            n, merge_time, pop_time, sort_time, count))
+
+def bench_methods(sizes):
+    """
+    Times alphabetize with each sort method for each roster size
+    :param sizes: a list of roster sizes
+    """
+    print('{0:>10} {1:>10} {2:>12} {3:>14}'.format('n', 'method', 'sort (s)', 'comparisons'))
+    for n in sizes:
+        roster = make_roster(n)
+        for method in SORT_METHODS:
+            sort_time, (_, count) = timed(alphabetize, roster, order_first_name, method)
+            print('{0:>10} {1:>10} {2:>12.3f} {3:>14}'.format(n, method, sort_time, count))
+
+def bench_keys(sizes):
+    """
+    Compares comparisons per second of ordering functions against precomputed keys
+    :param sizes: a list of roster sizes
+    """
+    print('{0:>10} {1:>10} {2:>12} {3:>16}'.format('n', 'path', 'sort (s)', 'comparisons/s'))
+    for n in sizes:
+        roster = make_roster(n)
+        paths = [('ordering', None), ('key', key_last_name),
+                 ('adapter', key_from_ordering(order_last_name))]
+        for name, key in paths:
+            sort_time, (_, count) = timed(alphabetize, roster, order_last_name, 'merge', key)
+            print('{0:>10} {1:>10} {2:>12.3f} {3:>16.0f}'.format(n, name, sort_time, count / sort_time))
+
+def measured(function, *args):
+    """
+    Measures the memory held by the result of a single call
+    :param function: the function to call
+    :param args: arguments for the function
+    :return: the bytes allocated and still alive after the call
+    """
+    tracemalloc.start()
+    result = function(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+def bench_memory(sizes):
+    """
+    Compares the memory of dict-based people, slotted people and a ColumnRoster
+    The names themselves are shared, so only the per-person overhead is measured
+    :param sizes: a list of roster sizes
+    """
+    print('{0:>10} {1:>12} {2:>16} {3:>16}'.format('n', 'storage', 'bytes', 'bytes/person'))
+    for n in sizes:
+        roster = make_roster(n)
+        storages = [
+            ('dict', lambda: [DictPerson(p.first, p.last, p.email) for p in roster]),
+            ('slots', lambda: [Person(p.first, p.last, p.email) for p in roster]),
+            ('columns', lambda: ColumnRoster(roster)),
+        ]
+        for name, build in storages:
+            size = measured(build)
+            print('{0:>10} {1:>12} {2:>16} {3:>16.1f}'.format(n, name, size, size / n))
+
+def bench_workers(sizes):
+    """
+    Times alphabetize with 1, 2, 4 and 8 worker processes
+    :param sizes: a list of roster sizes
+    """
+    print('{0:>10} {1:>8} {2:>12} {3:>14}'.format('n', 'workers', 'sort (s)', 'comparisons'))
+    for n in sizes:
+        roster = make_roster(n)
+        for workers in [1, 2, 4, 8]:
+            sort_time, (_, count) = timed(alphabetize, roster, order_first_name, 'merge', None, workers)
+            print('{0:>10} {1:>8} {2:>12.3f} {3:>14}'.format(n, workers, sort_time, count))
+
+def bench_presorted(sizes):
+    """
+    Compares merge and adaptive sorts on random, sorted and nearly sorted rosters
+    :param sizes: a list of roster sizes
+    """
+    print('{0:>10} {1:>8} {2:>10} {3:>12} {4:>14}'.format('n', 'input', 'method', 'sort (s)', 'comparisons'))
+    rng = random.Random(331)
+    for n in sizes:
+        roster = make_roster(n)
+        ordered = alphabetize(roster, order_first_name)[0]
+        nearly = list(ordered)
+        for _ in range(max(1, n // 1000)):
+            i = rng.randrange(n)
+            j = rng.randrange(n)
+            nearly[i], nearly[j] = nearly[j], nearly[i]
+        for name, people in [('random', roster), ('sorted', ordered), ('nearly', nearly)]:
+            for method in ['merge', 'adaptive']:
+                sort_time, (_, count) = timed(alphabetize, people, order_first_name, method)
+                print('{0:>10} {1:>8} {2:>10} {3:>12.3f} {4:>14}'.format(n, name, method, sort_time, count))
+
+def bench_sorted_roster(sizes, joins=1000):
+    """
+    Compares adding members to a SortedRoster against re-running alphabetize
+    :param sizes: a list of roster sizes
+    :param joins: the number of members that join
+    """
+    print('{0:>10} {1:>8} {2:>14} {3:>14}'.format('n', 'joins', 'insert (s)', 'resort (s)'))
+    for n in sizes:
+        roster = make_roster(n + joins)
+        members, joining = roster[:n], roster[n:]
+        sorted_roster = SortedRoster(order_last_name, members)
+        start = time.perf_counter()
+        for person in joining:
+            sorted_roster.insert(person)
+        insert_time = time.perf_counter() - start
+        resort_time, _ = timed(alphabetize, members + joining, order_last_name)
+        print('{0:>10} {1:>8} {2:>14.3f} {3:>14.3f}'.format(n, joins, insert_time, resort_time))
+
+def bench_io(sizes):
+    """
+    Compares throughput of the line by line and bulk roster readers and writers
+    :param sizes: a list of roster sizes
+    """
+    print('{0:>10} {1:>16} {2:>10} {3:>10}'.format('n', 'function', 'time (s)', 'MB/s'))
+    (handle, filename) = tempfile.mkstemp(suffix='.txt')
+    os.close(handle)
+    try:
+        for n in sizes:
+            roster = make_roster(n)
+            for function in [write_file, write_file_bulk]:
+                write_time, _ = timed(function, filename, roster)
+                megabytes = os.path.getsize(filename) / 2**20
+                print('{0:>10} {1:>16} {2:>10.3f} {3:>10.1f}'.format(
+                    n, function.__name__, write_time, megabytes / write_time))
+            for function in [load_file, load_file_bulk]:
+                load_time, _ = timed(function, filename)
+                print('{0:>10} {1:>16} {2:>10.3f} {3:>10.1f}'.format(
+                    n, function.__name__, load_time, megabytes / load_time))
+    finally:
+        os.remove(filename)
+
+def bench_verify(sizes):
+    """
+    Compares is_alphabetized with an ordering, with keys and with sampling
+    :param sizes: a list of roster sizes
+    """
+    print('{0:>10} {1:>10} {2:>12}'.format('n', 'mode', 'verify (s)'))
+    for n in sizes:
+        #the ordering check fails on repeated names, so keep one person per name
+        people = list({key_last_name(p): p for p in make_roster(n)}.values())
+        people = alphabetize(people, order_last_name)[0]
+        modes = [('ordering', (order_last_name,)), ('key', (None, key_last_name)),
+                 ('sample', (order_last_name, None, 1000))]
+        for name, args in modes:
+            verify_time, _ = timed(is_alphabetized, people, *args)
+            print('{0:>10} {1:>10} {2:>12.4f}'.format(n, name, verify_time))
+
+def bench_radix(sizes):
+    """
+    Compares merge and radix sorts by last name on rosters where most people share a few surnames
+    :param sizes: a list of roster sizes
+    """
+    print('{0:>10} {1:>8} {2:>12} {3:>14}'.format('n', 'method', 'sort (s)', 'comparisons'))
+    for n in sizes:
+        roster = make_roster(n)
+        for person in roster[:n * 3 // 4]:
+            person.last = 'Weasley'
+        for method in ['merge', 'radix']:
+            sort_time, (_, count) = timed(alphabetize, roster, order_last_name, method)
+            print('{0:>10} {1:>8} {2:>12.3f} {3:>14}'.format(n, method, sort_time, count))
+
+def bench_first_k(sizes, k=50):
+    """
+    Compares first_k against sorting the whole roster for one page
+    :param sizes: a list of roster sizes
+    :param k: the page size
+    """
+    print('{0:>10} {1:>12} {2:>12} {3:>14}'.format('n', 'function', 'time (s)', 'comparisons'))
+    for n in sizes:
+        roster = make_roster(n)
+        for name, function, args in [('first_k', first_k, (k,)), ('alphabetize', alphabetize, ())]:
+            sort_time, (_, count) = timed(function, roster, order_last_name, *args)
+            print('{0:>10} {1:>12} {2:>12.3f} {3:>14}'.format(n, name, sort_time, count))
+
+def order_last_name_folded(a, b):
+    """
+    Case and accent insensitive ordering that folds names on every comparison, kept for comparison
+    :param a: a Person
+    :param b: a Person
+    :return: True if a comes before b and False otherwise
+    """
+    fold = collate.__wrapped__
+    return (fold(a.last), fold(a.first), a.last, a.first) < (fold(b.last), fold(b.first), b.last, b.first)
+
+def bench_collated(sizes):
+    """
+    Compares plain and case and accent insensitive sorts by last name
+    :param sizes: a list of roster sizes
+    """
+    print('{0:>10} {1:>26} {2:>12}'.format('n', 'ordering', 'sort (s)'))
+    for n in sizes:
+        roster = make_roster(n)
+        for ordering in [order_last_name, order_last_name_collated, order_last_name_folded]:
+            collate.cache_clear()
+            sort_time, _ = timed(alphabetize, roster, ordering)
+            print('{0:>10} {1:>26} {2:>12.3f}'.format(n, ordering.__name__, sort_time))
+
+def main(sizes):
+    bench_merge(sizes)
+    bench_methods(sizes)
+    bench_keys(sizes)
+    bench_memory(sizes)
+    bench_workers(sizes)
+    bench_presorted(sizes)
+    bench_sorted_roster(sizes)
+    bench_io(sizes)
+    bench_verify(sizes)
+    bench_radix(sizes)
+    bench_first_k(sizes)
+    bench_collated(sizes)
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
@@ -1,30 +1,158 @@
 #!/usr/bin/python3
 
+import heapq
+import os
+import tempfile
+from itertools import islice
+
 from alphabetizer import *
     
+def load_lines(filename):
+    with open(filename, 'r') as reader:
+        for line in reader:
+            if line.strip():
+                (first, last, email) = line.split()
+                yield Person(first, last, email[1:-1])
+
 def load_file(filename):
+    return list(load_lines(filename))
+
+def parse_members(text, members):
+    # every non-blank line is exactly three whitespace separated fields
+    # unpacking a line with too few or too many fields raises ValueError like load_file
+    # each line's fields become a person straight away, only the people are kept
+    members.extend([Person(first, last, email[1:-1])
+                    for (first, last, email) in filter(None, map(str.split, text.split('\n')))])
+
+def load_file_bulk(filename, buffer_size=2**22):
+    # reads buffer_size characters at a time and parses each batch in one go
+    # runs about as fast as load_file, creating the people takes most of the time either way
+    # callers loading huge files can pause the collector around this themselves
     members = []
+    with open(filename, 'r', buffering=buffer_size) as reader:
+        rest = ''
+        while True:
+            text = reader.read(buffer_size)
+            if not text:
+                break
+            text = rest + text
+            end = text.rfind('\n') + 1
+            rest = text[end:]
+            parse_members(text[:end], members)
+        parse_members(rest, members)
+    return members
+
+def load_columns(filename):
+    members = ColumnRoster()
     with open(filename, 'r') as reader:
         for line in reader:
             if line.strip():
                 (first, last, email) = line.split()
-                members.append(Person(first, last, email[1:-1]))
+                members.add(first, last, email[1:-1])
     return members
-    
+
 def write_file(filename, memberlist):
     with open(filename, 'w') as writer:
         writer.writelines(str(member) + '\n' for member in memberlist)
-            
 
-def main(infile, outfile):
+def write_file_bulk(filename, memberlist, batch_size=2**16):
+    # formats batch_size members into one string per write
+    members = iter(memberlist)
+    with open(filename, 'w') as writer:
+        while True:
+            batch = list(islice(members, batch_size))
+            if not batch:
+                break
+            writer.write(''.join(['%s %s <%s>\n' % (m.first, m.last, m.email) for m in batch]))
+
+class RunHead:
+    # the current person of a sorted run, ordered for heapq by an ordering function
+    # ties go to the earlier run so the merge stays stable
+    __slots__ = ('person', 'run', 'ordering', 'counter')
+
+    def __init__(self, person, run, ordering, counter):
+        self.person = person
+        self.run = run
+        self.ordering = ordering
+        self.counter = counter
+
+    def __lt__(self, other):
+        self.counter[0] += 1
+        if self.ordering(self.person, other.person):
+            return True
+        self.counter[0] += 1
+        if self.ordering(other.person, self.person):
+            return False
+        return self.run < other.run
+
+def merge_files(filenames, outfile, ordering):
+    counter = [0]
+    readers = [load_lines(filename) for filename in filenames]
+    heap = []
+    for run, reader in enumerate(readers):
+        person = next(reader, None)
+        if person is not None:
+            heap.append(RunHead(person, run, ordering, counter))
+    heapq.heapify(heap)
+    with open(outfile, 'w') as writer:
+        while heap:
+            head = heap[0]
+            writer.write(str(head.person) + '\n')
+            person = next(readers[head.run], None)
+            if person is None:
+                heapq.heappop(heap)
+            else:
+                head.person = person
+                heapq.heapreplace(heap, head)
+    return counter[0]
+
+def external_sort(infile, outfile, ordering, run_bytes=64 * 2**20, method='merge'):
+    # sorts a roster file that may not fit in memory
+    # runs of about run_bytes of input text are sorted with alphabetize and spilled
+    # to temporary files, which are then merged into outfile
+    # returns the total number of comparisons made
+    count = 0
+    runs = []
+    try:
+        with open(infile, 'r') as reader:
+            while True:
+                lines = reader.readlines(run_bytes)
+                if not lines:
+                    break
+                members = []
+                for line in lines:
+                    if line.strip():
+                        (first, last, email) = line.split()
+                        members.append(Person(first, last, email[1:-1]))
+                (sorted_list, cost) = alphabetize(members, ordering, method)
+                count += cost
+                (handle, filename) = tempfile.mkstemp(prefix='run', suffix='.txt')
+                os.close(handle)
+                runs.append(filename)
+                write_file(filename, sorted_list)
+        count += merge_files(runs, outfile, ordering)
+    finally:
+        for filename in runs:
+            os.remove(filename)
+    return count
+
+def main(infile, outfile, profile=False):
     order = order_first_name
     #order = order_last_name
     member_list = load_file(infile)
-    (sorted_list, cost) = alphabetize(member_list, order)
-    if not is_alphabetized(sorted_list, order):
+    sort_profile = SortProfile() if profile else None
+    (sorted_list, cost) = alphabetize(member_list, order, profile=sort_profile)
+    if not is_alphabetized(sorted_list, order, ORDERING_KEYS.get(order)):
         print('Sorting was not successful!')
     print(cost, 'comparisons were required')
     write_file(outfile, sorted_list)
+    if sort_profile is not None:
+        # returns the structured report and prints one line per merge level
+        report = sort_profile.report()
+        for level in report['levels']:
+            print('depth {depth}: {calls} calls, {comparisons} comparisons, {moves} moves, '
+                  '{allocations} lists, {seconds:.4f}s'.format(**level))
+        return report
     
 if __name__ == '__main__':
     main('gryffindor.txt', 'sorted.txt')
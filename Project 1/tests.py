@@ -1,7 +1,10 @@
 #!/usr/bin/python3
+import os
+import tempfile
 import unittest
 
-from main import Person, load_file
+from main import Person, load_file, load_columns, external_sort, write_file
+from main import load_file_bulk, write_file_bulk
 from alphabetizer import *
 
 class TestAlphabetizer(unittest.TestCase):
@@ -27,6 +30,30 @@ class TestAlphabetizer(unittest.TestCase):
         member_list = load_file('sorted_last_name.txt')
         self.assertTrue(is_alphabetized(member_list, order_last_name))
         
+    def test_is_alphabetized_by_key(self):
+        member_list = load_file('gryffindor.txt')
+        first_list = load_file('sorted_first_name.txt')
+        last_list = load_file('sorted_last_name.txt')
+        for batch_size in [1, 2, 7, 2**16]:
+            for key in [key_first_name, key_from_ordering(order_first_name)]:
+                self.assertFalse(is_alphabetized(member_list, None, key, batch_size=batch_size))
+                self.assertTrue(is_alphabetized(first_list, None, key, batch_size=batch_size))
+                self.assertFalse(is_alphabetized(last_list, None, key, batch_size=batch_size))
+            self.assertTrue(is_alphabetized(last_list, None, key_last_name, batch_size=batch_size))
+            # only the last pair is out of order
+            swapped = last_list[:-2] + last_list[-1:] + last_list[-2:-1]
+            self.assertFalse(is_alphabetized(swapped, None, key_last_name, batch_size=batch_size))
+        self.assertTrue(is_alphabetized([], None, key_last_name))
+
+    def test_is_alphabetized_sample(self):
+        member_list = load_file('gryffindor.txt')
+        first_list = load_file('sorted_first_name.txt')
+        self.assertTrue(is_alphabetized(first_list, order_first_name, sample=10))
+        self.assertTrue(is_alphabetized(first_list, None, key_first_name, sample=10))
+        # checking every pair is the same as checking the whole roster
+        self.assertFalse(is_alphabetized(member_list, order_first_name, sample=len(member_list) - 2))
+        self.assertFalse(is_alphabetized(member_list, None, key_first_name, sample=len(member_list) - 2))
+
     def test_alphabetize_by_first(self):
         member_list = load_file('gryffindor.txt')
         solution = load_file('sorted_first_name.txt')
@@ -39,5 +66,263 @@ class TestAlphabetizer(unittest.TestCase):
         (sorted_list, cost) = alphabetize(member_list, order_last_name)
         self.assertEqual(sorted_list, solution)
         
+    def test_alphabetize_bottom_up(self):
+        member_list = load_file('gryffindor.txt')
+        solution = load_file('sorted_first_name.txt')
+        (sorted_list, cost) = alphabetize(member_list, order_first_name, 'bottom_up')
+        self.assertEqual(sorted_list, solution)
+        solution = load_file('sorted_last_name.txt')
+        (sorted_list, cost) = alphabetize(member_list, order_last_name, 'bottom_up')
+        self.assertEqual(sorted_list, solution)
+        self.assertEqual(([], 0), alphabetize([], order_last_name, 'bottom_up'))
+        # the result is never the roster itself, even when there is nothing to sort
+        single = member_list[:1]
+        for method in SORT_METHODS:
+            self.assertIsNot(member_list, alphabetize(member_list, order_first_name, method)[0])
+            self.assertIsNot(single, alphabetize(single, order_first_name, method)[0])
+        with self.assertRaises(ValueError):
+            alphabetize(member_list, order_last_name, 'bogus')
+
+    def test_alphabetize_by_key(self):
+        member_list = load_file('gryffindor.txt')
+        for ordering, filename in [(order_first_name, 'sorted_first_name.txt'),
+                                   (order_last_name, 'sorted_last_name.txt')]:
+            solution = load_file(filename)
+            for key in [ORDERING_KEYS[ordering], key_from_ordering(ordering)]:
+                for method in SORT_METHODS:
+                    if method == 'radix' and key not in ORDERING_KEYS.values():
+                        # radix sort needs keys made of strings
+                        with self.assertRaises(ValueError):
+                            alphabetize(member_list, None, method, key)
+                        continue
+                    (sorted_list, cost) = alphabetize(member_list, None, method, key)
+                    self.assertEqual(sorted_list, solution)
+                    self.assertTrue(cost > 0)
+
+    def test_alphabetize_columns(self):
+        member_list = load_columns('gryffindor.txt')
+        self.assertEqual(list(member_list), load_file('gryffindor.txt'))
+        for ordering, filename in [(order_first_name, 'sorted_first_name.txt'),
+                                   (order_last_name, 'sorted_last_name.txt')]:
+            solution = load_file(filename)
+            (sorted_roster, cost) = alphabetize(member_list, ordering)
+            self.assertIsInstance(sorted_roster, ColumnRoster)
+            self.assertEqual(list(sorted_roster), solution)
+            self.assertTrue(is_alphabetized(sorted_roster, ordering))
+            (sorted_roster, cost) = alphabetize(member_list, None, 'bottom_up',
+                                                key_from_ordering(ordering))
+            self.assertEqual(list(sorted_roster), solution)
+        # sorting only permutes the order, the columns are shared
+        self.assertIs(member_list.first, sorted_roster.first)
+        self.assertEqual(list(member_list), load_file('gryffindor.txt'))
+
+    def test_alphabetize_columns_known_keys(self):
+        member_list = load_columns('gryffindor.txt')
+        people = load_file('gryffindor.txt')
+        for key in [key_first_name, key_last_name, collated_first_name, collated_last_name]:
+            self.assertEqual(column_keys(member_list, key),
+                             [key(member_list.row(i)) for i in range(len(member_list))])
+        self.assertIsNone(column_keys(member_list, key_from_ordering(order_first_name)))
+        # known orderings never build a Person per row
+        def no_rows(i):
+            raise AssertionError('row built')
+        member_list.row = no_rows
+        for ordering in [order_first_name, order_last_name,
+                         order_first_name_collated, order_last_name_collated]:
+            (sorted_roster, cost) = alphabetize(member_list, ordering)
+            (solution, cost) = alphabetize(people, ordering)
+            self.assertEqual([member_list.email[i] for i in sorted_roster.order],
+                             [person.email for person in solution])
+
+    def test_alphabetize_adaptive(self):
+        member_list = load_file('gryffindor.txt')
+        for ordering, filename in [(order_first_name, 'sorted_first_name.txt'),
+                                   (order_last_name, 'sorted_last_name.txt')]:
+            solution = load_file(filename)
+            (sorted_list, cost) = alphabetize(member_list, ordering, 'adaptive')
+            self.assertEqual(sorted_list, solution)
+            # sorted and reversed input only needs the run scan
+            (sorted_list, cost) = alphabetize(solution, ordering, 'adaptive')
+            self.assertEqual(sorted_list, solution)
+            self.assertEqual(len(solution) - 1, cost)
+            (sorted_list, cost) = alphabetize(solution[::-1], ordering, 'adaptive')
+            self.assertEqual(sorted_list, solution)
+            self.assertEqual(len(solution) - 1, cost)
+            # a nearly sorted roster stays close to n comparisons
+            nearly = solution[1:] + solution[:1]
+            (sorted_list, cost) = alphabetize(nearly, ordering, 'adaptive')
+            self.assertEqual(sorted_list, solution)
+            self.assertLess(cost, 2 * len(solution))
+
+    def test_alphabetize_radix(self):
+        member_list = load_file('gryffindor.txt')
+        for ordering, filename in [(order_first_name, 'sorted_first_name.txt'),
+                                   (order_last_name, 'sorted_last_name.txt')]:
+            solution = load_file(filename)
+            (sorted_list, cost) = alphabetize(member_list, ordering, 'radix')
+            self.assertEqual(sorted_list, solution)
+            (sorted_list, cost) = alphabetize(member_list, None, 'radix', ORDERING_KEYS[ordering])
+            self.assertEqual(sorted_list, solution)
+        # shared surnames and names that are prefixes of others
+        weasleys = [Person(first, 'Weasley', first[0].lower() + 'weasley@hogwarts.edu')
+                    for first in ['Ronald', 'Ron', 'Fred', 'George', 'Ginny', 'Bill', 'Charlie',
+                                  'Percy', 'Arthur', 'Molly', 'Ginevra', 'Rose', 'Hugo',
+                                  'Fleur', 'Victoire', 'Dominique', 'Louis', 'Ro', 'R']]
+        (sorted_list, cost) = alphabetize(weasleys + member_list, order_last_name, 'radix')
+        self.assertEqual(sorted_list, alphabetize(weasleys + member_list, order_last_name)[0])
+        with self.assertRaises(ValueError):
+            alphabetize(member_list, lambda a, b: a.email < b.email, 'radix')
+
+    def test_alphabetize_parallel(self):
+        member_list = load_file('gryffindor.txt')
+        for ordering, filename in [(order_first_name, 'sorted_first_name.txt'),
+                                   (order_last_name, 'sorted_last_name.txt')]:
+            solution = load_file(filename)
+            for workers in [2, 3, 4]:
+                (sorted_list, cost) = alphabetize(member_list, ordering, workers=workers)
+                self.assertEqual(sorted_list, solution)
+                (sorted_list, cost) = alphabetize(member_list, ordering, 'bottom_up',
+                                                  ORDERING_KEYS[ordering], workers)
+                self.assertEqual(sorted_list, solution)
+        self.assertEqual(([], 0), alphabetize([], order_first_name, workers=4))
+
+    def test_first_k(self):
+        member_list = load_file('gryffindor.txt')
+        solution = load_file('sorted_last_name.txt')
+        for k in [0, 1, 10, len(solution), len(solution) + 5]:
+            (first, cost) = first_k(member_list, order_last_name, k)
+            self.assertEqual(first, solution[:k])
+        (first, cost) = first_k(member_list, order_last_name, 1)
+        self.assertLess(cost, alphabetize(member_list, order_last_name)[1])
+        for number in range(6):
+            (people, cost) = page(member_list, order_last_name, number, 10)
+            self.assertEqual(people, solution[number * 10:number * 10 + 10])
+
+    def test_sorted_roster(self):
+        member_list = load_file('gryffindor.txt')
+        solution = load_file('sorted_last_name.txt')
+        roster = SortedRoster(order_last_name, member_list[:10])
+        for member in member_list[10:30]:
+            roster.insert(member)
+        roster.insert_many(member_list[30:])
+        self.assertEqual(len(solution), len(roster))
+        self.assertEqual(list(roster), solution)
+        harry = Person('Harry', 'Potter', 'hpotter@hogwarts.edu')
+        self.assertTrue(harry in roster)
+        self.assertTrue(roster.remove(harry))
+        self.assertFalse(harry in roster)
+        self.assertFalse(roster.remove(harry))
+        self.assertEqual(len(solution) - 1, len(roster))
+        self.assertEqual(len(solution) - 1, roster.remove_many(member_list))
+        self.assertEqual([], list(roster))
+        roster.insert_many(reversed(member_list))
+        (handle, outfile) = tempfile.mkstemp(suffix='.txt')
+        os.close(handle)
+        try:
+            write_file(outfile, roster)
+            self.assertEqual(load_file(outfile), solution)
+        finally:
+            os.remove(outfile)
+
+    def test_bulk_io(self):
+        member_list = load_file('gryffindor.txt')
+        self.assertEqual(load_file_bulk('gryffindor.txt'), member_list)
+        # batches that split lines
+        self.assertEqual(load_file_bulk('gryffindor.txt', 7), member_list)
+        (handle, outfile) = tempfile.mkstemp(suffix='.txt')
+        os.close(handle)
+        try:
+            write_file_bulk(outfile, member_list, 8)
+            self.assertEqual(load_file(outfile), member_list)
+            with open(outfile, 'a') as writer:
+                writer.write('Nearly Headless Nick <nick@hogwarts.edu>\n')
+            with self.assertRaises(ValueError):
+                load_file_bulk(outfile)
+        finally:
+            os.remove(outfile)
+
+    def test_bulk_io_bad_lines(self):
+        # a short line next to a long one has the right field total but must still fail
+        (handle, outfile) = tempfile.mkstemp(suffix='.txt')
+        os.close(handle)
+        try:
+            with open(outfile, 'w') as writer:
+                writer.write('Ron <r@x>\nMary Jane Watson <m@x>\n')
+            with self.assertRaises(ValueError):
+                load_file(outfile)
+            with self.assertRaises(ValueError):
+                load_file_bulk(outfile)
+            with self.assertRaises(ValueError):
+                load_file_bulk(outfile, 7)
+            with open(outfile, 'w') as writer:
+                writer.write('Ron Weasley <r@x>\n\n   \nMary Watson <m@x>')
+            self.assertEqual(load_file_bulk(outfile, 5), load_file(outfile))
+        finally:
+            os.remove(outfile)
+
+    def test_external_sort(self):
+        (handle, outfile) = tempfile.mkstemp(suffix='.txt')
+        os.close(handle)
+        try:
+            for ordering, filename in [(order_first_name, 'sorted_first_name.txt'),
+                                       (order_last_name, 'sorted_last_name.txt')]:
+                # a small budget forces several runs to be merged
+                cost = external_sort('gryffindor.txt', outfile, ordering, 300)
+                self.assertEqual(load_file(outfile), load_file(filename))
+                self.assertTrue(cost > 0)
+                external_sort('gryffindor.txt', outfile, ordering)
+                self.assertEqual(load_file(outfile), load_file(filename))
+        finally:
+            os.remove(outfile)
+
+    def test_alphabetize_collated(self):
+        people = [Person('emma', 'Zabini', 'ezabini@hogwarts.edu'),
+                  Person('Eve', 'ångström', 'eangstrom@hogwarts.edu'),
+                  Person('Élodie', 'Abbott', 'eabbott@hogwarts.edu'),
+                  Person('Eve', 'Ångström', 'eangstrom2@hogwarts.edu'),
+                  Person('eve', 'Abbott', 'eabbott2@hogwarts.edu')]
+        self.assertEqual('elodie', collate('Élodie'))
+        self.assertEqual('angstrom', collate('Ångström'))
+        by_first = [people[2], people[0], people[4], people[3], people[1]]
+        by_last = [people[2], people[4], people[3], people[1], people[0]]
+        for method in SORT_METHODS:
+            (sorted_list, cost) = alphabetize(people, order_first_name_collated, method)
+            self.assertEqual(sorted_list, by_first)
+            (sorted_list, cost) = alphabetize(people, order_last_name_collated, method)
+            self.assertEqual(sorted_list, by_last)
+        self.assertTrue(order_last_name_collated(people[2], people[4]))
+        self.assertTrue(is_alphabetized(by_last, order_last_name_collated))
+        self.assertFalse(is_alphabetized(by_first, None, collated_last_name))
+
+    def test_alphabetize_profile(self):
+        member_list = load_file('gryffindor.txt')
+        solution = load_file('sorted_first_name.txt')
+        (_, expected_cost) = alphabetize(member_list, order_first_name)
+        for key in [None, key_first_name]:
+            profile = SortProfile()
+            (sorted_list, cost) = alphabetize(member_list, order_first_name, key=key, profile=profile)
+            self.assertEqual(sorted_list, solution)
+            self.assertEqual(expected_cost, cost)
+            report = profile.report()
+            self.assertEqual(cost, report['comparisons'])
+            self.assertEqual(6, report['max_depth'])
+            self.assertEqual(1, report['levels'][0]['calls'])
+            self.assertEqual(2 * len(member_list), report['levels'][0]['moves'])
+            self.assertEqual(2 * len(member_list) - 1, report['calls'])
+        with self.assertRaises(ValueError):
+            alphabetize(member_list, order_first_name, 'bottom_up', profile=SortProfile())
+
+    def test_merge(self):
+        member_list = load_file('gryffindor.txt')
+        left = alphabetize(member_list[:25], order_first_name)[0]
+        right = alphabetize(member_list[25:], order_first_name)[0]
+        (merged, cost) = merge(left, right, order_first_name)
+        self.assertTrue(is_alphabetized(merged, order_first_name))
+        self.assertEqual(len(member_list), len(merged))
+        self.assertLess(cost, len(member_list))
+        # the inputs are left untouched
+        self.assertEqual(25, len(left))
+        self.assertEqual(len(member_list) - 25, len(right))
+
 if __name__ == '__main__':
     unittest.main()
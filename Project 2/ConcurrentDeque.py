@@ -0,0 +1,294 @@
+"""
+Deques that can be shared between producers and consumers, built on Deque.
+ConcurrentDeque is for threads, AsyncDeque for asyncio tasks. Both can be given
+a capacity, in which case pushes wait for room.
+"""
+######################
+# ConcurrentDeque.py
+######################
+import asyncio
+import threading
+
+from Deque import Deque
+class ConcurrentDeque:
+    """
+    A thread-safe double-ended queue
+    Pops wait for an element and pushes wait for room unless block is False,
+    in which case they raise IndexError straight away
+    """
+    def __init__(self, capacity=None):
+        """
+        Initializes an empty ConcurrentDeque
+        :param capacity: The most elements it may hold, None for no limit
+        """
+        self.deque = Deque()
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full = threading.Condition(self.lock)
+    def __len__(self):
+        """
+        Computes the number of elements in the Deque
+        :return: The size of the Deque
+        """
+        with self.lock:
+            return len(self.deque)
+    def is_full(self):
+        """
+        Checks if there is no room, the lock must be held
+        :return: True if the Deque is at capacity
+        """
+        return self.capacity is not None and len(self.deque) >= self.capacity
+    def wait(self, condition, ready, block, timeout):
+        """
+        Waits on a condition until ready() holds, the lock must be held
+        :param condition: The Condition to wait on
+        :param ready: A function that returns True once the caller can go ahead
+        :param block: False to give up straight away
+        :param timeout: The most seconds to wait, None to wait forever
+        """
+        if not block:
+            if not ready():
+                raise IndexError
+            return
+        if not condition.wait_for(ready, timeout):
+            raise IndexError
+    def push(self, e, front, block, timeout):
+        """
+        Inserts an element at either end once there is room
+        :param e: An element to insert
+        :param front: True for the front, False for the back
+        :param block: False to raise IndexError instead of waiting for room
+        :param timeout: The most seconds to wait, None to wait forever
+        """
+        with self.not_full:
+            self.wait(self.not_full, lambda: not self.is_full(), block, timeout)
+            if front:
+                self.deque.push_front(e)
+            else:
+                self.deque.push_back(e)
+            self.not_empty.notify()
+    def pop(self, front, block, timeout):
+        """
+        Removes and returns the element at either end once there is one
+        :param front: True for the front, False for the back
+        :param block: False to raise IndexError instead of waiting for an element
+        :param timeout: The most seconds to wait, None to wait forever
+        :return: The element
+        """
+        with self.not_empty:
+            self.wait(self.not_empty, lambda: len(self.deque) > 0, block, timeout)
+            if front:
+                e = self.deque.pop_front()
+            else:
+                e = self.deque.pop_back()
+            self.not_full.notify()
+            return e
+    def push_front(self, e, block=True, timeout=None):
+        """
+        Inserts an element at the front of the Deque
+        :param e: An element to insert
+        :param block: False to raise IndexError instead of waiting for room
+        :param timeout: The most seconds to wait, None to wait forever
+        """
+        self.push(e, True, block, timeout)
+    def push_back(self, e, block=True, timeout=None):
+        """
+        Inserts an element at the back of the Deque
+        :param e: An element to insert
+        :param block: False to raise IndexError instead of waiting for room
+        :param timeout: The most seconds to wait, None to wait forever
+        """
+        self.push(e, False, block, timeout)
+    def pop_front(self, block=True, timeout=None):
+        """
+        Removes and returns the first element
+        :param block: False to raise IndexError instead of waiting for an element
+        :param timeout: The most seconds to wait, None to wait forever
+        :return: The (former) first element
+        """
+        return self.pop(True, block, timeout)
+    def pop_back(self, block=True, timeout=None):
+        """
+        Removes and returns the last element
+        :param block: False to raise IndexError instead of waiting for an element
+        :param timeout: The most seconds to wait, None to wait forever
+        :return: The (former) last element
+        """
+        return self.pop(False, block, timeout)
+    def peek_front(self):
+        """
+        Looks at, but does not remove, the first element
+        :return: The first element
+        """
+        with self.lock:
+            return self.deque.peek_front()
+    def peek_back(self):
+        """
+        Looks at, but does not remove, the last element
+        :return: The last element
+        """
+        with self.lock:
+            return self.deque.peek_back()
+    def clear(self):
+        """
+        Removes all elements from the Deque
+        """
+        with self.lock:
+            self.deque.clear()
+            self.not_full.notify_all()
+    def __iter__(self):
+        """
+        Iterates over a snapshot of this Deque from front to back
+        :return: An iterator
+        """
+        with self.lock:
+            return iter(list(self.deque))
+    def is_empty(self):
+        """
+        Checks if the Deque is empty
+        :return: True if the Deque contains no elements, False otherwise
+        """
+        return len(self) == 0
+    def __repr__(self):
+        """
+        A string representation of this Deque
+        :return: A string
+        """
+        return 'Deque([{0}])'.format(','.join(str(item) for item in self))
+class AsyncDeque:
+    """
+    A double-ended queue for asyncio tasks
+    The awaitable pushes and pops wait for room or an element, the _nowait ones
+    raise IndexError instead
+    Waiting tasks are woken one at a time, in the order they started waiting
+    """
+    def __init__(self, capacity=None):
+        """
+        Initializes an empty AsyncDeque
+        :param capacity: The most elements it may hold, None for no limit
+        """
+        self.deque = Deque()
+        self.capacity = capacity
+        #futures of tasks waiting for an element and for room
+        self.getters = Deque()
+        self.putters = Deque()
+    def __len__(self):
+        """
+        Computes the number of elements in the Deque
+        :return: The size of the Deque
+        """
+        return len(self.deque)
+    def is_full(self):
+        """
+        Checks if there is no room
+        :return: True if the Deque is at capacity
+        """
+        return self.capacity is not None and len(self.deque) >= self.capacity
+    def wake(self, waiters):
+        """
+        Wakes the longest waiting task that is still waiting
+        :param waiters: A Deque of futures
+        """
+        while waiters:
+            waiter = waiters.pop_front()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+    async def wait(self, waiters, ready):
+        """
+        Waits until ready() holds
+        :param waiters: The Deque of futures to wait in
+        :param ready: A function that returns True once the caller can go ahead
+        """
+        while not ready():
+            waiter = asyncio.get_running_loop().create_future()
+            waiters.push_back(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                waiter.cancel()
+                #pass on a wake up this task will not use
+                if ready():
+                    self.wake(waiters)
+                raise
+    def push_front_nowait(self, e):
+        """
+        Inserts an element at the front of the Deque if there is room
+        :param e: An element to insert
+        """
+        if self.is_full():
+            raise IndexError
+        self.deque.push_front(e)
+        self.wake(self.getters)
+    def push_back_nowait(self, e):
+        """
+        Inserts an element at the back of the Deque if there is room
+        :param e: An element to insert
+        """
+        if self.is_full():
+            raise IndexError
+        self.deque.push_back(e)
+        self.wake(self.getters)
+    def pop_front_nowait(self):
+        """
+        Removes and returns the first element if there is one
+        :return: The (former) first element
+        """
+        e = self.deque.pop_front()
+        self.wake(self.putters)
+        return e
+    def pop_back_nowait(self):
+        """
+        Removes and returns the last element if there is one
+        :return: The (former) last element
+        """
+        e = self.deque.pop_back()
+        self.wake(self.putters)
+        return e
+    async def push_front(self, e):
+        """
+        Inserts an element at the front of the Deque, waiting for room
+        :param e: An element to insert
+        """
+        await self.wait(self.putters, lambda: not self.is_full())
+        self.push_front_nowait(e)
+    async def push_back(self, e):
+        """
+        Inserts an element at the back of the Deque, waiting for room
+        :param e: An element to insert
+        """
+        await self.wait(self.putters, lambda: not self.is_full())
+        self.push_back_nowait(e)
+    async def pop_front(self):
+        """
+        Removes and returns the first element, waiting for one
+        :return: The (former) first element
+        """
+        await self.wait(self.getters, lambda: len(self.deque) > 0)
+        return self.pop_front_nowait()
+    async def pop_back(self):
+        """
+        Removes and returns the last element, waiting for one
+        :return: The (former) last element
+        """
+        await self.wait(self.getters, lambda: len(self.deque) > 0)
+        return self.pop_back_nowait()
+    def __iter__(self):
+        """
+        Iterates over a snapshot of this Deque from front to back
+        :return: An iterator
+        """
+        return iter(list(self.deque))
+    def is_empty(self):
+        """
+        Checks if the Deque is empty
+        :return: True if the Deque contains no elements, False otherwise
+        """
+        return len(self) == 0
+    def __repr__(self):
+        """
+        A string representation of this Deque
+        :return: A string
+        """
+        return 'Deque([{0}])'.format(','.join(str(item) for item in self))
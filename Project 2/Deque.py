@@ -5,10 +5,13 @@ data. Also, implement other methods to modify the deque.
 ######################
 # Deque.py
 ######################
+from itertools import islice
+from math import isqrt
 class Node:
     """
     A node class to be used by the Deque class
     """
+    __slots__ = ('data', 'next_node', 'prev_node')
     def __init__(self, data):
         #Initialize the nodes
         self.data = data
@@ -21,13 +24,38 @@ class Deque:
     """
     A double-ended queue
     """
-    def __init__(self):
+    def __init__(self, pool_size=0):
         """
         Initializes an empty Deque
+        :param pool_size: How many popped nodes to keep for reuse by later pushes
         """
         self.head = None
         self.tail = None
         self.length = 0
+        #free list of recycled nodes
+        self.pool = []
+        self.pool_size = pool_size
+    def new_node(self, e):
+        """
+        Makes a node for an element, reusing a pooled node if there is one
+        :param e: An element
+        :return: A node holding e
+        """
+        if self.pool:
+            node = self.pool.pop()
+            node.data = e
+            return node
+        return Node(e)
+    def recycle(self, node):
+        """
+        Keeps an unlinked node for reuse if the pool has room
+        :param node: A node that is no longer in the Deque
+        """
+        if len(self.pool) < self.pool_size:
+            node.data = None
+            node.next_node = None
+            node.prev_node = None
+            self.pool.append(node)
     def __len__(self):
         """
         Computes the number of elements in the Deque
@@ -60,7 +88,7 @@ class Deque:
         :param e: An element to insert
         """
         #make the node to add
-        new_node = Node(e)
+        new_node = self.new_node(e)
         #make sure the deque is not empty
         if self.head is None:
             self.head = new_node
@@ -78,7 +106,7 @@ class Deque:
         :param e: An element to insert
         """
         #make the node to add
-        new_node = Node(e)
+        new_node = self.new_node(e)
         #make sure the deque is not empty
         if self.tail is None:
             self.tail = new_node
@@ -100,12 +128,16 @@ class Deque:
             raise IndexError
         else:
             #store the node to pop
-            node_data = self.head.data
+            node = self.head
+            node_data = node.data
             #update the head
-            self.head = self.head.next_node
+            self.head = node.next_node
             #check the deque is not empty
             if self.head is not None:
                 self.head.prev_node = None
+            else:
+                self.tail = None
+            self.recycle(node)
             #decrement length
             self.length -= 1
             return node_data
@@ -119,12 +151,16 @@ class Deque:
             raise IndexError
         else:
             #store the node to pop
-            node_data = self.tail.data
+            node = self.tail
+            node_data = node.data
             #update the tail
-            self.tail = self.tail.prev_node
+            self.tail = node.prev_node
             #check the deque is not empty
             if self.tail is not None:
                 self.tail.next_node = None
+            else:
+                self.head = None
+            self.recycle(node)
             #decrement length
             self.length -= 1
             return node_data
@@ -132,6 +168,12 @@ class Deque:
         """
         Removes all elements from the Deque
         """
+        #Recycle as many nodes as the pool has room for
+        node = self.head
+        while node is not None and len(self.pool) < self.pool_size:
+            next_node = node.next_node
+            self.recycle(node)
+            node = next_node
         #Erase pointers to the deque
         self.tail = None
         self.head = None
@@ -148,15 +190,106 @@ class Deque:
             #return the node's data
             yield node.data
             node = node.next_node
-    def extend(self, other):
+    def build_chain(self, elements):
+        """
+        Links nodes for a sequence of elements in one pass
+        :param elements: An iterable of elements
+        :return: The first node, the last node and the number of nodes
+        """
+        if self.pool:
+            nodes = [self.new_node(e) for e in elements]
+        else:
+            nodes = list(map(Node, elements))
+        for prev_node, node in zip(nodes, islice(nodes, 1, None)):
+            prev_node.next_node = node
+            node.prev_node = prev_node
+        if not nodes:
+            return None, None, 0
+        return nodes[0], nodes[-1], len(nodes)
+    def take_chain(self, other):
+        """
+        Empties another Deque, handing over its nodes
+        :param other: A Deque object other than self
+        :return: The first node, the last node and the number of nodes
+        """
+        chain = (other.head, other.tail, other.length)
+        other.head = None
+        other.tail = None
+        other.length = 0
+        return chain
+    def extend(self, other, steal=False):
         """
         Takes a Deque object and adds each of its elements to the back of self
-        :param other: A Deque object
+        :param other: A Deque object or any iterable of elements
+        :param steal: Move other's nodes over in O(1) instead of copying, leaving other empty
+        """
+        if steal and isinstance(other, Deque) and other is not self:
+            first, last, count = self.take_chain(other)
+        else:
+            #copy self first so extending a Deque with itself ends
+            first, last, count = self.build_chain(list(other) if other is self else other)
+        if first is None:
+            return
+        #link the chain after the tail
+        if self.tail is None:
+            self.head = first
+        else:
+            self.tail.next_node = first
+            first.prev_node = self.tail
+        self.tail = last
+        self.length += count
+    def extend_front(self, other, steal=False):
+        """
+        Adds the elements of other to the front of self, keeping their order
+        :param other: A Deque object or any iterable of elements
+        :param steal: Move other's nodes over in O(1) instead of copying, leaving other empty
+        """
+        if steal and isinstance(other, Deque) and other is not self:
+            first, last, count = self.take_chain(other)
+        else:
+            first, last, count = self.build_chain(list(other) if other is self else other)
+        if first is None:
+            return
+        #link the chain before the head
+        if self.head is None:
+            self.tail = last
+        else:
+            self.head.prev_node = last
+            last.next_node = self.head
+        self.head = first
+        self.length += count
+    def split_at(self, index):
         """
-        #iterate through other
-        for i in other:
-            #add each element to the back of self
-            Deque.push_back(self, i)
+        Splits the Deque in two, keeping the elements before index
+        Walks from whichever end is closer, then relinks in O(1)
+        :param index: The position of the first element to move
+        :return: A new Deque holding the elements from index on
+        """
+        if index < 0 or index > len(self):
+            raise IndexError
+        back = Deque(self.pool_size)
+        if index == len(self):
+            return back
+        #find the node at index
+        if index <= len(self) // 2:
+            node = self.head
+            for _ in range(index):
+                node = node.next_node
+        else:
+            node = self.tail
+            for _ in range(len(self) - 1 - index):
+                node = node.prev_node
+        back.head = node
+        back.tail = self.tail
+        back.length = len(self) - index
+        self.tail = node.prev_node
+        if self.tail is None:
+            self.head = None
+        else:
+            self.tail.next_node = None
+        node.prev_node = None
+        self.length = index
+        return back
     def drop_between(self, start, end):
         """
         Deletes elements from the Deque that within the range [start, end)
@@ -166,6 +299,8 @@ class Deque:
         #check the range
         if start < 0 or end > len(self) or start > end:
             raise IndexError
+        if start == end:
+            return
         node_start = self.head
         node_end = self.head
         #find the node at start
@@ -183,7 +318,9 @@ class Deque:
         else:
             node_start.prev_node.next_node = node_end
         if node_end is None:
-            node_start = self.tail
+            self.tail = node_start.prev_node
+            if self.tail is not None:
+                self.tail.next_node = None
         else:
             node_end.prev_node = node_start.prev_node
         #modify length
@@ -217,4 +354,457 @@ class Deque:
         :return: A string
         """
         return 'Deque([{0}])'.format(','.join(str(item) for item in self))
-    
\ No newline at end of file
+class ArrayDeque:
+    """
+    A double-ended queue stored in a growable circular array
+    Has the same methods as Deque without a node per element
+    """
+    def __init__(self, capacity=8):
+        """
+        Initializes an empty ArrayDeque
+        :param capacity: The number of slots to start with
+        """
+        self.data = [None] * max(1, capacity)
+        self.front = 0
+        self.length = 0
+    def __len__(self):
+        """
+        Computes the number of elements in the Deque
+        :return: The size of the Deque
+        """
+        return self.length
+    def grow(self):
+        """
+        Doubles the number of slots, moving the elements to the start of the array
+        """
+        capacity = len(self.data)
+        #copy the elements in order, unwrapping them
+        data = self.data[self.front:] + self.data[:self.front]
+        data.extend([None] * capacity)
+        self.data = data
+        self.front = 0
+    def peek_front(self):
+        """
+        Looks at, but does not remove, the first element
+        :return: The first element
+        """
+        if not self:
+            raise IndexError
+        return self.data[self.front]
+    def peek_back(self):
+        """
+        Looks at, but does not remove, the last element
+        :return: The last element
+        """
+        if not self:
+            raise IndexError
+        return self.data[(self.front + self.length - 1) % len(self.data)]
+    def push_front(self, e):
+        """
+        Inserts an element at the front of the Deque
+        :param e: An element to insert
+        """
+        if self.length == len(self.data):
+            self.grow()
+        self.front = (self.front - 1) % len(self.data)
+        self.data[self.front] = e
+        self.length += 1
+    def push_back(self, e):
+        """
+        Inserts an element at the back of the Deque
+        :param e: An element to insert
+        """
+        if self.length == len(self.data):
+            self.grow()
+        self.data[(self.front + self.length) % len(self.data)] = e
+        self.length += 1
+    def pop_front(self):
+        """
+        Removes and returns the first element
+        :return: The (former) first element
+        """
+        if self.length == 0:
+            raise IndexError
+        e = self.data[self.front]
+        #drop the reference so the element can be collected
+        self.data[self.front] = None
+        self.front = (self.front + 1) % len(self.data)
+        self.length -= 1
+        return e
+    def pop_back(self):
+        """
+        Removes and returns the last element
+        :return: The (former) last element
+        """
+        if self.length == 0:
+            raise IndexError
+        back = (self.front + self.length - 1) % len(self.data)
+        e = self.data[back]
+        self.data[back] = None
+        self.length -= 1
+        return e
+    def clear(self):
+        """
+        Removes all elements from the Deque
+        """
+        self.data = [None] * len(self.data)
+        self.front = 0
+        self.length = 0
+    def __iter__(self):
+        """
+        Iterates over this Deque from front to back
+        :return: An iterator
+        """
+        data = self.data
+        end = self.front + self.length
+        #the elements up to the end of the array, then any that wrapped around
+        yield from islice(data, self.front, min(end, len(data)))
+        yield from islice(data, 0, max(0, end - len(data)))
+    def extend(self, other):
+        """
+        Takes a Deque object and adds each of its elements to the back of self
+        :param other: A Deque object
+        """
+        for i in list(other):
+            self.push_back(i)
+    def drop_between(self, start, end):
+        """
+        Deletes elements from the Deque that within the range [start, end)
+        Moves whichever side of the range is shorter
+        :param start: indicates the first position of the range
+        :param end: indicates the last position of the range(does not drop this element)
+        """
+        if start < 0 or end > len(self) or start > end:
+            raise IndexError
+        data = self.data
+        capacity = len(data)
+        gap = end - start
+        if start < self.length - end:
+            #shift the elements before start back over the range
+            for i in reversed(range(start)):
+                data[(self.front + i + gap) % capacity] = data[(self.front + i) % capacity]
+            for i in range(gap):
+                data[(self.front + i) % capacity] = None
+            self.front = (self.front + gap) % capacity
+        else:
+            #shift the elements from end on forward over the range
+            for i in range(end, self.length):
+                data[(self.front + i - gap) % capacity] = data[(self.front + i) % capacity]
+            for i in range(self.length - gap, self.length):
+                data[(self.front + i) % capacity] = None
+        self.length -= gap
+    def count_if(self, criteria):
+        """
+        counts how many elements of the Deque satisfy the criteria
+        :param criteria: a bool function that takes an element of the Deque
+        and returns true if that element matches the criteria and false otherwise
+        :return: How many elements satisfy the criteria
+        """
+        count = 0
+        for e in self:
+            if criteria(e):
+                count += 1
+        return count
+    def is_empty(self):
+        """
+        Checks if the Deque is empty
+        :return: True if the Deque contains no elements, False otherwise
+        """
+        return len(self) == 0
+    def __repr__(self):
+        """
+        A string representation of this Deque
+        :return: A string
+        """
+        return 'Deque([{0}])'.format(','.join(str(item) for item in self))
+class BlockDeque:
+    """
+    A double-ended queue stored as a run of blocks, each a list of up to twice the
+    block size elements, where the block size grows as the square root of the length
+    The blocks sit in an array of slots with free slots at both ends, so blocks are
+    added and removed at either end in amortized O(1)
+    The sizes of the inner blocks, all but the first and last, are kept in a Fenwick
+    tree that is updated in place. Pushes and pops at the ends never touch it, and a
+    position is found in O(log n)
+    insert and drop_between only shift inside a block, and relay the O(sqrt n) blocks
+    when they split, merge or drop blocks
+    """
+    MIN_BLOCK_SIZE = 64
+    def __init__(self):
+        """
+        Initializes an empty BlockDeque
+        """
+        self.length = 0
+        self.rebuild([])
+    def __len__(self):
+        """
+        Computes the number of elements in the Deque
+        :return: The size of the Deque
+        """
+        return self.length
+    def block_size(self):
+        """
+        The size new blocks fill up to, blocks are split at twice this
+        :return: The block size for the current length
+        """
+        return max(self.MIN_BLOCK_SIZE, isqrt(self.length))
+    def rebuild(self, blocks):
+        """
+        Lays out blocks in a new array of slots with free slots at both ends and
+        rebuilds the Fenwick tree of the inner block sizes
+        :param blocks: A list of the non-empty blocks in order
+        """
+        room = len(blocks) + 4
+        self.slots = [None] * room + blocks + [None] * room
+        #the slots of the first and last block, first > last when empty
+        self.first = room
+        self.last = room + len(blocks) - 1
+        #tree[i] holds the sizes of the slots (i - (i & -i), i], counting from 1
+        tree = [0] * (len(self.slots) + 1)
+        for slot in range(self.first + 1, self.last):
+            tree[slot + 1] = len(self.slots[slot])
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self.tree = tree
+    def add_size(self, slot, change):
+        """
+        Changes the size recorded in the Fenwick tree for an inner block
+        :param slot: The slot of the block
+        :param change: The number of elements added, negative when removed
+        """
+        tree = self.tree
+        i = slot + 1
+        while i < len(tree):
+            tree[i] += change
+            i += i & -i
+    def blocks(self):
+        """
+        Lists the blocks in order
+        :return: A list of the blocks
+        """
+        return self.slots[self.first:self.last + 1]
+    def locate(self, index):
+        """
+        Finds the block holding a position
+        :param index: A position in [0, len(self))
+        :return: The slot of the block and the position within that block
+        """
+        front = len(self.slots[self.first])
+        if index < front:
+            return self.first, index
+        back_start = self.length - len(self.slots[self.last])
+        if index >= back_start:
+            return self.last, index - back_start
+        #walk down the Fenwick tree to the inner block holding the position
+        tree = self.tree
+        rest = index - front
+        i = 0
+        step = 1 << (len(tree).bit_length() - 1)
+        while step:
+            if i + step < len(tree) and tree[i + step] <= rest:
+                i += step
+                rest -= tree[i]
+            step >>= 1
+        #the first i slots hold no more than rest elements, so slot i holds the position
+        return i, rest
+    def __getitem__(self, index):
+        """
+        Looks at the element at a position
+        :param index: A position, negative positions count from the back
+        :return: The element
+        """
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError
+        slot, i = self.locate(index)
+        return self.slots[slot][i]
+    def split(self, slot):
+        """
+        Splits a block that has grown past twice the block size
+        :param slot: The slot of the block
+        """
+        block = self.slots[slot]
+        if len(block) > 2 * self.block_size():
+            half = len(block) // 2
+            blocks = self.blocks()
+            b = slot - self.first
+            blocks[b:b + 1] = [block[:half], block[half:]]
+            self.rebuild(blocks)
+    def insert(self, index, e):
+        """
+        Inserts an element so it ends up at a position
+        :param index: A position in [0, len(self)]
+        :param e: An element to insert
+        """
+        if not 0 <= index <= self.length:
+            raise IndexError
+        if index == self.length:
+            self.push_back(e)
+            return
+        if index == 0:
+            self.push_front(e)
+            return
+        slot, i = self.locate(index)
+        self.slots[slot].insert(i, e)
+        self.length += 1
+        if self.first < slot < self.last:
+            self.add_size(slot, 1)
+        self.split(slot)
+    def peek_front(self):
+        """
+        Looks at, but does not remove, the first element
+        :return: The first element
+        """
+        if not self:
+            raise IndexError
+        return self.slots[self.first][0]
+    def peek_back(self):
+        """
+        Looks at, but does not remove, the last element
+        :return: The last element
+        """
+        if not self:
+            raise IndexError
+        return self.slots[self.last][-1]
+    def push_front(self, e):
+        """
+        Inserts an element at the front of the Deque
+        :param e: An element to insert
+        """
+        if self.length and len(self.slots[self.first]) < self.block_size():
+            self.slots[self.first].insert(0, e)
+        else:
+            if self.first == 0:
+                self.rebuild(self.blocks())
+            #the old first block becomes an inner block
+            if self.length and self.first < self.last:
+                self.add_size(self.first, len(self.slots[self.first]))
+            self.first -= 1
+            self.slots[self.first] = [e]
+        self.length += 1
+    def push_back(self, e):
+        """
+        Inserts an element at the back of the Deque
+        :param e: An element to insert
+        """
+        if self.length and len(self.slots[self.last]) < self.block_size():
+            self.slots[self.last].append(e)
+        else:
+            if self.last == len(self.slots) - 1:
+                self.rebuild(self.blocks())
+            #the old last block becomes an inner block
+            if self.length and self.first < self.last:
+                self.add_size(self.last, len(self.slots[self.last]))
+            self.last += 1
+            self.slots[self.last] = [e]
+        self.length += 1
+    def pop_front(self):
+        """
+        Removes and returns the first element
+        :return: The (former) first element
+        """
+        if self.length == 0:
+            raise IndexError
+        block = self.slots[self.first]
+        e = block.pop(0)
+        self.length -= 1
+        if not block:
+            self.slots[self.first] = None
+            self.first += 1
+            #the new first block was an inner block
+            if self.first < self.last:
+                self.add_size(self.first, -len(self.slots[self.first]))
+        return e
+    def pop_back(self):
+        """
+        Removes and returns the last element
+        :return: The (former) last element
+        """
+        if self.length == 0:
+            raise IndexError
+        block = self.slots[self.last]
+        e = block.pop()
+        self.length -= 1
+        if not block:
+            self.slots[self.last] = None
+            self.last -= 1
+            #the new last block was an inner block
+            if self.first < self.last:
+                self.add_size(self.last, -len(self.slots[self.last]))
+        return e
+    def clear(self):
+        """
+        Removes all elements from the Deque
+        """
+        self.length = 0
+        self.rebuild([])
+    def __iter__(self):
+        """
+        Iterates over this Deque from front to back
+        :return: An iterator
+        """
+        for block in self.blocks():
+            yield from block
+    def extend(self, other):
+        """
+        Takes a Deque object and adds each of its elements to the back of self
+        :param other: A Deque object
+        """
+        for i in list(other):
+            self.push_back(i)
+    def drop_between(self, start, end):
+        """
+        Deletes elements from the Deque that within the range [start, end)
+        :param start: indicates the first position of the range
+        :param end: indicates the last position of the range(does not drop this element)
+        """
+        if start < 0 or end > len(self) or start > end:
+            raise IndexError
+        if start == end:
+            return
+        slot_start, i_start = self.locate(start)
+        slot_end, i_end = self.locate(end - 1)
+        blocks = self.blocks()
+        b_start = slot_start - self.first
+        b_end = slot_end - self.first
+        if b_start == b_end:
+            del blocks[b_start][i_start:i_end + 1]
+        else:
+            #trim the two end blocks and drop every block between them
+            del blocks[b_end][:i_end + 1]
+            del blocks[b_start][i_start:]
+            del blocks[b_start + 1:b_end]
+        self.length -= end - start
+        #remove blocks that were emptied and join what is left if it fits in one block
+        blocks[b_start:b_start + 2] = [block for block in blocks[b_start:b_start + 2] if block]
+        if b_start + 1 < len(blocks):
+            if len(blocks[b_start]) + len(blocks[b_start + 1]) <= self.block_size():
+                blocks[b_start].extend(blocks.pop(b_start + 1))
+        self.rebuild(blocks)
+    def count_if(self, criteria):
+        """
+        counts how many elements of the Deque satisfy the criteria
+        :param criteria: a bool function that takes an element of the Deque
+        and returns true if that element matches the criteria and false otherwise
+        :return: How many elements satisfy the criteria
+        """
+        count = 0
+        for e in self:
+            if criteria(e):
+                count += 1
+        return count
+    def is_empty(self):
+        """
+        Checks if the Deque is empty
+        :return: True if the Deque contains no elements, False otherwise
+        """
+        return len(self) == 0
+    def __repr__(self):
+        """
+        A string representation of this Deque
+        :return: A string
+        """
+        return 'Deque([{0}])'.format(','.join(str(item) for item in self))
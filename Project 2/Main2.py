@@ -1,34 +1,130 @@
 #!/usr/bin/python3
 
+from itertools import groupby
+from operator import itemgetter
+
 from Deque import Deque
 
+#opcodes of a compiled script
+PUSH, POP, CLEAR, PRINT, LEN, COUNT, KEEP, FAIL = range(8)
+#how the lines of a run of pushes may start
+PUSH_HEADS = {'+f', '+b'}
+
+
+def compile_line(line, program):
+    #append the instruction for one stripped line
+    try:
+        if line.startswith('+f'):
+            program.append((PUSH, [line.split()[1]], []))
+        elif line.startswith('+b'):
+            program.append((PUSH, [], [line.split()[1]]))
+        elif line == '-f':
+            program.append((POP, 1, 0))
+        elif line == '-b':
+            program.append((POP, 0, 1))
+        elif line == 'clear':
+            program.append((CLEAR,))
+        elif line == 'print':
+            program.append((PRINT,))
+        elif line == 'len':
+            program.append((LEN,))
+        elif line.startswith('count'):
+            #a missing term only fails once there is an element to test it on
+            program.append((COUNT, (line.split() + [None])[1]))
+        elif line.startswith('keep'):
+            program.append((KEEP, int(line.split()[1]), int(line.split()[2])))
+        else:
+            raise KeyError(line)
+    except (IndexError, KeyError, ValueError) as error:
+        #fail when reached, after the output of the lines before it
+        program.append((FAIL, error))
+
+
+def compile_script(lines):
+    #parse each line once, turning each run of pushes and each run of pops into one instruction
+    #pops that undo the pushes before them are dropped along with those pushes
+    program = []
+    for sign, group in groupby(map(str.strip, lines), itemgetter(slice(0, 1))):
+        group = list(group)
+        if sign == '+' and set(map(itemgetter(slice(0, 2)), group)) <= PUSH_HEADS:
+            try:
+                fronts = [line.split()[1] for line in group if line[1] == 'f']
+                backs = [line.split()[1] for line in group if line[1] == 'b']
+            except IndexError:
+                pass
+            else:
+                if program and program[-1][0] == PUSH:
+                    #two runs of pushes with nothing left between them are one run
+                    program[-1][1].extend(fronts)
+                    program[-1][2].extend(backs)
+                else:
+                    program.append((PUSH, fronts, backs))
+                continue
+        elif sign == '-':
+            front = group.count('-f')
+            back = group.count('-b')
+            if front + back == len(group):
+                if program and program[-1][0] == PUSH:
+                    #pops take back the pushes just before them at the same end
+                    _, fronts, backs = program[-1]
+                    cancelled = min(front, len(fronts))
+                    del fronts[len(fronts) - cancelled:]
+                    front -= cancelled
+                    cancelled = min(back, len(backs))
+                    del backs[len(backs) - cancelled:]
+                    back -= cancelled
+                if front or back:
+                    program.append((POP, front, back))
+                continue
+        for line in group:
+            compile_line(line, program)
+    return program
+
+
+def execute(program, deque=None):
+    #run a compiled script, returns the deque it ran on
+    if deque is None:
+        deque = Deque()
+    for instruction in program:
+        opcode = instruction[0]
+        if opcode == PUSH:
+            _, fronts, backs = instruction
+            deque.extend_front(reversed(fronts))
+            deque.extend(backs)
+        elif opcode == POP:
+            _, front, back = instruction
+            #a run of pops fails somewhere exactly when it wants more than there is
+            if front + back > len(deque):
+                raise IndexError
+            if back:
+                deque.split_at(len(deque) - back)
+            if front:
+                rest = deque.split_at(front)
+                deque.clear()
+                deque.extend(rest, True)
+        elif opcode == CLEAR:
+            deque.clear()
+        elif opcode == PRINT:
+            print(deque)
+        elif opcode == LEN:
+            print('length:', len(deque))
+        elif opcode == COUNT:
+            term = instruction[1]
+            if term is None and len(deque):
+                raise IndexError
+            deque.count_if(lambda s : term in s)
+        elif opcode == KEEP:
+            deque.drop_between(instruction[1], instruction[2])
+        else:
+            raise instruction[1]
+    return deque
+
 
 def main(filename):
-    deque = Deque()
     with open(filename, 'r') as reader:
-        for line in reader:
-            line = line.strip()
-            if line.startswith('+f'):
-                deque.push_front(line.split()[1])
-            elif line.startswith('+b'):
-                deque.push_back(line.split()[1])
-            elif line == '-f':
-                deque.pop_front()
-            elif line == '-b':
-                deque.pop_back()
-            elif line == 'clear':
-                deque.clear()
-            elif line == 'print':
-                print(deque)
-            elif line == 'len':
-                print('length:', len(deque))
-            elif line.startswith('count'):
-                deque.count_if(lambda s : line.split()[1] in s)
-            elif line.startswith('keep'):
-                deque.drop_between(int(line.split()[1]),int(line.split()[2]))
-            else:
-                raise KeyError(line)
+        program = compile_script(reader)
+    execute(program)
 
 
 if __name__ == '__main__':
-    main('example.txt')
\ No newline at end of file
+    main('example.txt')
@@ -0,0 +1,125 @@
+"""
+A sliding window over a stream of values, built on Deque. Keeps the minimum,
+maximum, sum and number of matching elements up to date as values enter at the
+back and leave at the front, so reading them does not walk the window.
+"""
+######################
+# SlidingWindow.py
+######################
+from Deque import Deque
+class SlidingWindow:
+    """
+    A window of values with running aggregates
+    The minimum and maximum are kept with monotonic deques: candidates for the
+    minimum in increasing order and for the maximum in decreasing order, each
+    dropped as soon as a later value makes it unable to win
+    Every value enters and leaves each deque at most once, so pushes and pops
+    are amortized O(1)
+    """
+    def __init__(self, size=None, criteria=None, pool_size=1024):
+        """
+        Initializes an empty SlidingWindow
+        :param size: The most values it holds, push_back drops the oldest past this, None for no limit
+        :param criteria: a bool function counted over the window, None to count nothing
+        :param pool_size: How many popped nodes each deque keeps for reuse
+        """
+        self.size = size
+        self.criteria = criteria
+        self.window = Deque(pool_size)
+        self.mins = Deque(pool_size)
+        self.maxes = Deque(pool_size)
+        self.total = 0
+        self.matching = 0
+    def __len__(self):
+        """
+        Computes the number of values in the window
+        :return: The size of the window
+        """
+        return len(self.window)
+    def push_back(self, e):
+        """
+        Adds a value to the back of the window, dropping the oldest if the window is full
+        :param e: A value comparable with the others
+        """
+        if self.size is not None and self.window.length >= self.size:
+            self.pop_front()
+        self.window.push_back(e)
+        #values that e beats can never be the minimum (or maximum) again
+        #the tails are read directly, peek_back would check the length each time
+        mins = self.mins
+        while mins.tail is not None and mins.tail.data > e:
+            mins.pop_back()
+        mins.push_back(e)
+        maxes = self.maxes
+        while maxes.tail is not None and maxes.tail.data < e:
+            maxes.pop_back()
+        maxes.push_back(e)
+        self.total += e
+        if self.criteria is not None and self.criteria(e):
+            self.matching += 1
+    def pop_front(self):
+        """
+        Removes and returns the oldest value
+        :return: The (former) first value
+        """
+        e = self.window.pop_front()
+        #equal values are all kept, so the front only leaves with its own value
+        if self.mins.head.data == e:
+            self.mins.pop_front()
+        if self.maxes.head.data == e:
+            self.maxes.pop_front()
+        self.total -= e
+        if self.criteria is not None and self.criteria(e):
+            self.matching -= 1
+        return e
+    def min(self):
+        """
+        Finds the smallest value in the window
+        :return: The minimum
+        """
+        return self.mins.peek_front()
+    def max(self):
+        """
+        Finds the largest value in the window
+        :return: The maximum
+        """
+        return self.maxes.peek_front()
+    def sum(self):
+        """
+        Adds up the values in the window, float sums drift like any running total
+        :return: The sum
+        """
+        return self.total
+    def count(self):
+        """
+        Counts the values in the window that satisfy the criteria
+        :return: How many values match
+        """
+        return self.matching
+    def clear(self):
+        """
+        Removes all values from the window
+        """
+        self.window.clear()
+        self.mins.clear()
+        self.maxes.clear()
+        self.total = 0
+        self.matching = 0
+    def __iter__(self):
+        """
+        Iterates over the window from oldest to newest
+        :return: An iterator
+        """
+        return iter(self.window)
+    def is_empty(self):
+        """
+        Checks if the window is empty
+        :return: True if the window contains no values, False otherwise
+        """
+        return len(self) == 0
+    def __repr__(self):
+        """
+        A string representation of this window
+        :return: A string
+        """
+        return 'SlidingWindow([{0}])'.format(','.join(str(item) for item in self))
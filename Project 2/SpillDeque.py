@@ -0,0 +1,214 @@
+"""
+A deque that keeps its two ends in memory and pages its middle out to disk,
+built on Deque. Meant for work queues whose consumers can fall far behind.
+"""
+######################
+# SpillDeque.py
+######################
+import os
+import pickle
+import shutil
+import tempfile
+import weakref
+
+from Deque import Deque
+class SpillDeque:
+    """
+    A double-ended queue with a cap on the elements held in memory
+    The elements are a hot front Deque, then the spilled segments in order, then
+    a hot back Deque. When the two Deques together pass memory_limit, a block of
+    segment_size elements from the inner end of the longer one is pickled to a
+    segment file. Pops that empty an end unpickle the next segment back whole,
+    spilling from the other end if that passes the limit. The cap counts elements, not bytes
+    """
+    def __init__(self, memory_limit=2**16, segment_size=2**12, directory=None):
+        """
+        Initializes an empty SpillDeque
+        :param memory_limit: The most elements to keep in memory before spilling
+        :param segment_size: The number of elements in each segment file
+        :param directory: Where to make the folder for segment files, None for the system temporary folder
+        """
+        if segment_size < 1 or memory_limit < 2 * segment_size:
+            raise ValueError('memory_limit must be at least twice segment_size')
+        self.memory_limit = memory_limit
+        self.segment_size = segment_size
+        self.front = Deque()
+        self.back = Deque()
+        #(path, count) of each segment file, front to back
+        self.segments = Deque()
+        self.spilled = 0
+        self.files = 0
+        self.directory = tempfile.mkdtemp(prefix='spilldeque-', dir=directory)
+        #remove the segment files when the deque goes away
+        self.finalizer = weakref.finalize(self, shutil.rmtree, self.directory, True)
+    def __len__(self):
+        """
+        Computes the number of elements in the Deque
+        :return: The size of the Deque
+        """
+        return len(self.front) + self.spilled + len(self.back)
+    def write_segment(self, elements):
+        """
+        Pickles a block of elements to a new segment file
+        :param elements: A Deque of elements
+        :return: The path and the number of elements
+        """
+        path = os.path.join(self.directory, '{0}.seg'.format(self.files))
+        self.files += 1
+        with open(path, 'wb') as writer:
+            pickle.dump(list(elements), writer, pickle.HIGHEST_PROTOCOL)
+        self.spilled += len(elements)
+        return path, len(elements)
+    def load_segment(self, path):
+        """
+        Unpickles all the elements of a segment file at once
+        :param path: The segment file
+        :return: A list of its elements
+        """
+        with open(path, 'rb') as reader:
+            return pickle.load(reader)
+    def read_segment(self, segment):
+        """
+        Loads a segment file back into memory and deletes it
+        :param segment: The path and the number of elements
+        :return: A Deque of its elements
+        """
+        path, count = segment
+        elements = self.load_segment(path)
+        os.remove(path)
+        self.spilled -= count
+        deque = Deque()
+        deque.extend(elements)
+        return deque
+    def spill(self):
+        """
+        Pages a segment out from the longer in-memory end if over the memory limit
+        """
+        if len(self.front) + len(self.back) <= self.memory_limit:
+            return
+        #the longer end holds more than half the limit, so at least a whole segment
+        if len(self.back) >= len(self.front):
+            #the oldest elements at the back sit next to the segments
+            rest = self.back.split_at(self.segment_size)
+            self.segments.push_back(self.write_segment(self.back))
+            self.back = rest
+        else:
+            block = self.front.split_at(len(self.front) - self.segment_size)
+            self.segments.push_front(self.write_segment(block))
+    def fill_front(self):
+        """
+        Makes sure the front Deque has the first element if there is one
+        """
+        if not self.front and self.segments:
+            self.front = self.read_segment(self.segments.pop_front())
+            #the loaded segment can push the back over the limit
+            self.spill()
+    def fill_back(self):
+        """
+        Makes sure the back Deque has the last element if there is one
+        """
+        if not self.back and self.segments:
+            self.back = self.read_segment(self.segments.pop_back())
+            #the loaded segment can push the front over the limit
+            self.spill()
+    def peek_front(self):
+        """
+        Looks at, but does not remove, the first element
+        :return: The first element
+        """
+        self.fill_front()
+        if self.front:
+            return self.front.peek_front()
+        return self.back.peek_front()
+    def peek_back(self):
+        """
+        Looks at, but does not remove, the last element
+        :return: The last element
+        """
+        self.fill_back()
+        if self.back:
+            return self.back.peek_back()
+        return self.front.peek_back()
+    def push_front(self, e):
+        """
+        Inserts an element at the front of the Deque
+        :param e: An element to insert
+        """
+        self.front.push_front(e)
+        self.spill()
+    def push_back(self, e):
+        """
+        Inserts an element at the back of the Deque
+        :param e: An element to insert
+        """
+        self.back.push_back(e)
+        self.spill()
+    def pop_front(self):
+        """
+        Removes and returns the first element
+        :return: The (former) first element
+        """
+        self.fill_front()
+        if self.front:
+            return self.front.pop_front()
+        return self.back.pop_front()
+    def pop_back(self):
+        """
+        Removes and returns the last element
+        :return: The (former) last element
+        """
+        self.fill_back()
+        if self.back:
+            return self.back.pop_back()
+        return self.front.pop_back()
+    def clear(self):
+        """
+        Removes all elements from the Deque, deleting its segment files
+        """
+        for path, _ in self.segments:
+            os.remove(path)
+        self.segments.clear()
+        self.spilled = 0
+        self.front.clear()
+        self.back.clear()
+    def close(self):
+        """
+        Deletes the segment files and their folder, the Deque can not be used afterwards
+        """
+        self.finalizer()
+    def __iter__(self):
+        """
+        Iterates over this Deque from front to back, loading each segment whole in turn without keeping it
+        :return: An iterator
+        """
+        yield from self.front
+        for path, _ in self.segments:
+            yield from self.load_segment(path)
+        yield from self.back
+    def extend(self, other):
+        """
+        Takes a Deque object and adds each of its elements to the back of self
+        :param other: A Deque object or any iterable of elements
+        """
+        for e in list(other) if other is self else other:
+            self.push_back(e)
+    def count_if(self, criteria):
+        """
+        counts how many elements of the Deque satisfy the criteria
+        :param criteria: a bool function that takes an element of the Deque
+        and returns true if that element matches the criteria and false otherwise
+        :return: How many elements satisfy the criteria
+        """
+        return sum(1 for e in self if criteria(e))
+    def is_empty(self):
+        """
+        Checks if the Deque is empty
+        :return: True if the Deque contains no elements, False otherwise
+        """
+        return len(self) == 0
+    def __repr__(self):
+        """
+        A string representation of this Deque
+        :return: A string
+        """
+        return 'Deque([{0}])'.format(','.join(str(item) for item in self))
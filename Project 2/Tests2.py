@@ -0,0 +1,775 @@
+#!/usr/bin/python3
+
+import asyncio
+import contextlib
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+
+from ConcurrentDeque import ConcurrentDeque, AsyncDeque
+from Deque import Deque, ArrayDeque, BlockDeque
+from Main2 import compile_script, execute
+from SlidingWindow import SlidingWindow
+from SpillDeque import SpillDeque
+
+
+def run_each(filename):
+    # the old Main2.main, one dispatch and split per line, the reference for the compiled runner
+    deque = Deque()
+    with open(filename, 'r') as reader:
+        for line in reader:
+            line = line.strip()
+            if line.startswith('+f'):
+                deque.push_front(line.split()[1])
+            elif line.startswith('+b'):
+                deque.push_back(line.split()[1])
+            elif line == '-f':
+                deque.pop_front()
+            elif line == '-b':
+                deque.pop_back()
+            elif line == 'clear':
+                deque.clear()
+            elif line == 'print':
+                print(deque)
+            elif line == 'len':
+                print('length:', len(deque))
+            elif line.startswith('count'):
+                deque.count_if(lambda s : line.split()[1] in s)
+            elif line.startswith('keep'):
+                deque.drop_between(int(line.split()[1]),int(line.split()[2]))
+            else:
+                raise KeyError(line)
+
+
+def random_script(n, seed):
+    # about n lines of bursts of pushes and pops with the odd len and keep, ending in a print
+    rng = random.Random(seed)
+    lines = []
+    size = 0
+    while len(lines) < n:
+        for _ in range(rng.randint(1, 64)):
+            lines.append(rng.choice(['+f', '+b']) + ' w' + str(rng.randrange(1000)))
+            size += 1
+        for _ in range(rng.randint(0, size)):
+            lines.append(rng.choice(['-f', '-b']))
+            size -= 1
+        if rng.random() < 0.05:
+            lines.append('len')
+        if rng.random() < 0.05 and size > 1:
+            start = rng.randrange(size)
+            end = min(size, start + 10)
+            lines.append('keep {0} {1}'.format(start, end))
+            size -= end - start
+    return '\n'.join(lines) + '\nprint\n'
+
+
+def wrapped(capacity, front, back):
+    # an ArrayDeque whose elements run past the end of its array and wrap to the start
+    deque = ArrayDeque(capacity)
+    for i in range(back):
+        deque.push_back(i)
+    for i in range(1, front + 1):
+        deque.push_front(-i)
+    return deque
+
+
+class DequeTests(unittest.TestCase):
+
+    def test_pop_front_to_empty(self):
+        deque = Deque()
+        deque.push_back(1)
+        deque.push_back(2)
+        self.assertEqual(1, deque.pop_front())
+        self.assertEqual(2, deque.pop_front())
+        self.assertIsNone(deque.head)
+        self.assertIsNone(deque.tail)
+        self.assertRaises(IndexError, deque.pop_back)
+        deque.push_back(3)
+        self.assertEqual([3], list(deque))
+        self.assertEqual(3, deque.peek_front())
+        self.assertEqual(3, deque.peek_back())
+
+    def test_pop_back_to_empty(self):
+        deque = Deque()
+        deque.push_front(1)
+        deque.push_front(2)
+        self.assertEqual(1, deque.pop_back())
+        self.assertEqual(2, deque.pop_back())
+        self.assertIsNone(deque.head)
+        self.assertIsNone(deque.tail)
+        self.assertRaises(IndexError, deque.pop_front)
+        deque.push_front(3)
+        self.assertEqual([3], list(deque))
+        self.assertEqual(3, deque.peek_back())
+
+    def test_drop_between_to_end(self):
+        deque = Deque()
+        for i in range(6):
+            deque.push_back(i)
+        deque.drop_between(3, 6)
+        self.assertEqual([0, 1, 2], list(deque))
+        self.assertEqual(2, deque.peek_back())
+        deque.push_back(9)
+        self.assertEqual([0, 1, 2, 9], list(deque))
+        self.assertEqual(9, deque.pop_back())
+        self.assertEqual(2, deque.pop_back())
+
+    def test_drop_between_empty_range(self):
+        deque = Deque()
+        for i in range(3):
+            deque.push_back(i)
+        deque.drop_between(3, 3)
+        deque.drop_between(0, 0)
+        self.assertEqual([0, 1, 2], list(deque))
+        self.assertEqual(3, len(deque))
+        deque.drop_between(0, 3)
+        self.assertTrue(deque.is_empty())
+        deque.push_back(4)
+        self.assertEqual(4, deque.peek_front())
+        self.assertEqual(4, deque.peek_back())
+        self.assertRaises(IndexError, deque.drop_between, 0, 2)
+
+
+class ConcatTests(unittest.TestCase):
+
+    def check_links(self, deque):
+        # walking the prev links back from the tail gives the elements in reverse
+        backwards = []
+        node = deque.tail
+        while node is not None:
+            backwards.append(node.data)
+            node = node.prev_node
+        self.assertEqual(list(deque), backwards[::-1])
+        self.assertEqual(len(backwards), len(deque))
+
+    def test_split_at(self):
+        for index in range(7):
+            deque = Deque()
+            deque.extend(range(6))
+            back = deque.split_at(index)
+            self.assertEqual(list(range(index)), list(deque))
+            self.assertEqual(list(range(index, 6)), list(back))
+            self.check_links(deque)
+            self.check_links(back)
+            deque.push_back('x')
+            back.push_front('y')
+            self.assertEqual(list(range(index)) + ['x'], list(deque))
+            self.assertEqual(['y'] + list(range(index, 6)), list(back))
+        self.assertRaises(IndexError, Deque().split_at, 1)
+        self.assertRaises(IndexError, Deque().split_at, -1)
+
+    def test_extend_steal(self):
+        deque = Deque()
+        deque.extend([1, 2])
+        other = Deque()
+        other.extend([3, 4])
+        deque.extend(other, True)
+        self.assertEqual([1, 2, 3, 4], list(deque))
+        self.assertTrue(other.is_empty())
+        self.assertIsNone(other.head)
+        self.assertIsNone(other.tail)
+        other.extend([0, -1])
+        deque.extend_front(other, True)
+        self.assertEqual([0, -1, 1, 2, 3, 4], list(deque))
+        self.assertEqual(0, len(other))
+        self.check_links(deque)
+        # stealing into an empty deque and from an empty deque
+        empty = Deque()
+        empty.extend(deque, True)
+        self.assertEqual([0, -1, 1, 2, 3, 4], list(empty))
+        empty.extend(deque, True)
+        empty.extend_front(deque, True)
+        self.assertEqual(6, len(empty))
+        self.check_links(empty)
+
+    def test_extend_self(self):
+        deque = Deque()
+        deque.extend([1, 2, 3])
+        deque.extend(deque)
+        self.assertEqual([1, 2, 3, 1, 2, 3], list(deque))
+        deque.extend_front(deque)
+        self.assertEqual([1, 2, 3] * 4, list(deque))
+        # stealing from itself copies instead
+        deque.extend(deque, True)
+        self.assertEqual([1, 2, 3] * 8, list(deque))
+        self.check_links(deque)
+
+    def test_extend_pooled(self):
+        deque = Deque(8)
+        deque.extend(range(5))
+        deque.clear()
+        self.assertEqual(5, len(deque.pool))
+        deque.extend(range(10))
+        self.assertEqual(list(range(10)), list(deque))
+        self.assertEqual(0, len(deque.pool))
+        self.check_links(deque)
+        deque.extend_front(iter(['a', 'b']))
+        self.assertEqual(['a', 'b'] + list(range(10)), list(deque))
+        self.check_links(deque)
+
+
+class PoolTests(unittest.TestCase):
+
+    def test_pool_reuses_nodes(self):
+        deque = Deque(4)
+        for i in range(3):
+            deque.push_back(i)
+        nodes = [deque.head, deque.head.next_node, deque.tail]
+        deque.pop_front()
+        deque.pop_back()
+        self.assertEqual(2, len(deque.pool))
+        # pooled nodes hold nothing, so popped elements can be collected
+        self.assertTrue(all(node.data is None for node in deque.pool))
+        deque.push_front('a')
+        deque.push_back('b')
+        self.assertEqual([], deque.pool)
+        self.assertIs(nodes[0], deque.tail)
+        self.assertIs(nodes[2], deque.head)
+        self.assertEqual(['a', 1, 'b'], list(deque))
+        self.assertIsNone(deque.head.prev_node)
+        self.assertIsNone(deque.tail.next_node)
+
+    def test_pool_size_limit(self):
+        deque = Deque(2)
+        for i in range(10):
+            deque.push_back(i)
+        for i in range(5):
+            self.assertEqual(i, deque.pop_front())
+        self.assertEqual(2, len(deque.pool))
+        deque.clear()
+        self.assertEqual(2, len(deque.pool))
+        self.assertTrue(deque.is_empty())
+        self.assertEqual(0, len(Deque().pool))
+
+    def test_pool_clear_recycles(self):
+        deque = Deque(8)
+        for i in range(5):
+            deque.push_back(i)
+        deque.clear()
+        self.assertEqual(5, len(deque.pool))
+        self.assertTrue(all(node.data is None and node.next_node is None for node in deque.pool))
+        for i in range(7):
+            deque.push_back(i)
+        self.assertEqual(list(range(7)), list(deque))
+        self.assertEqual(0, len(deque.pool))
+
+
+class ArrayDequeTests(unittest.TestCase):
+
+    def test_grow(self):
+        deque = ArrayDeque(2)
+        for i in range(1, 20):
+            deque.push_front(-i)
+            deque.push_back(i)
+        self.assertEqual(list(range(-19, 0)) + list(range(1, 20)), list(deque))
+        self.assertEqual(38, len(deque))
+        self.assertGreaterEqual(len(deque.data), 38)
+
+    def test_grow_wrapped(self):
+        deque = wrapped(8, 3, 5)
+        self.assertEqual(len(deque.data), len(deque))
+        deque.push_back(5)
+        self.assertEqual(0, deque.front)
+        self.assertEqual([-3, -2, -1, 0, 1, 2, 3, 4, 5], list(deque))
+        self.assertEqual(-3, deque.peek_front())
+        self.assertEqual(5, deque.peek_back())
+
+    def test_drop_between_wrapped(self):
+        expected = [-3, -2, -1, 0, 1, 2, 3]
+        for start in range(len(expected) + 1):
+            for end in range(start, len(expected) + 1):
+                deque = wrapped(8, 3, 4)
+                deque.drop_between(start, end)
+                self.assertEqual(expected[:start] + expected[end:], list(deque), (start, end))
+                self.assertEqual(len(expected) - end + start, len(deque))
+                # the freed slots are reusable at both ends
+                deque.push_front('f')
+                deque.push_back('b')
+                self.assertEqual(['f'] + expected[:start] + expected[end:] + ['b'], list(deque))
+
+    def test_pop_wrapped(self):
+        deque = wrapped(8, 3, 4)
+        self.assertEqual(3, deque.pop_back())
+        self.assertEqual(-3, deque.pop_front())
+        self.assertEqual([-2, -1, 0, 1, 2], list(deque))
+        deque.clear()
+        self.assertRaises(IndexError, deque.pop_front)
+
+class ScriptTests(unittest.TestCase):
+
+    def run_script(self, run, filename):
+        # the printed output and the type of the exception that stopped the script, if any
+        output = io.StringIO()
+        error = None
+        with contextlib.redirect_stdout(output):
+            try:
+                run(filename)
+            except Exception as raised:
+                error = type(raised)
+        return output.getvalue(), error
+
+    def assertSameRun(self, text):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, directory)
+        filename = os.path.join(directory, 'script.txt')
+        with open(filename, 'w') as writer:
+            writer.write(text)
+        self.addCleanup(os.remove, filename)
+
+        def run_compiled(name):
+            with open(name, 'r') as reader:
+                execute(compile_script(reader))
+
+        expected = self.run_script(run_each, filename)
+        self.assertEqual(expected, self.run_script(run_compiled, filename), text)
+        return expected
+
+    def test_runs_and_cancellations(self):
+        lines = ['+f a', '+b b', '+f c', '-f', '-b', 'print', '+b d', '+b e', '-b', '-f', '-f',
+                 'len', '+f f', '-b', 'print', '+f g', '+b h', '+f i', '-f', '-f', '-f', 'len',
+                 '+b j', '+b k', '+b l', 'keep 1 2', 'print', 'count j', 'clear', 'len']
+        output, error = self.assertSameRun('\n'.join(lines) + '\n')
+        self.assertIsNone(error)
+        self.assertIn('length:', output)
+
+    def test_pop_empty(self):
+        for text in ['-f\n', '-b\n', 'print\n-f\n-f\nprint\n', '+f a\n-f\n-f\n', '+b a\n+f b\n-b\n-b\n-f\n',
+                     '+f a\nprint\n-b\n-f\nprint\n', 'clear\n-b\n']:
+            self.assertEqual(IndexError, self.assertSameRun(text)[1], text)
+
+    def test_bad_lines(self):
+        scripts = ['+f a\nprint\npush c\nprint\n', '+f a\n\n+b b\nprint\n', '+f a\n+ b\n', '+f a\n-x\n',
+                   '+f a\n-f\n-g\n', 'keep 1\n', '+f a\nkeep a b\n', '+b a\nkeep 0 5\n', 'print\n\n']
+        for text in scripts:
+            self.assertIsNotNone(self.assertSameRun(text)[1], text)
+
+    def test_push_without_argument(self):
+        for text in ['+f\n', '+f a\n+fx\nprint\n', '+b a\n+b b\n+b\n', 'print\n+f a\n+f\n+b c\n',
+                     '+f a\n+b\n-f\n']:
+            self.assertEqual(IndexError, self.assertSameRun(text)[1], text)
+
+    def test_count_without_argument(self):
+        # the old loop only reads the argument when there is an element to test
+        self.assertIsNone(self.assertSameRun('count\nprint\n')[1])
+        self.assertEqual(IndexError, self.assertSameRun('+f a\ncount\nprint\n')[1])
+
+    def test_random_scripts(self):
+        for seed in range(5):
+            self.assertSameRun(random_script(2000, seed))
+
+
+class SlidingWindowTests(unittest.TestCase):
+
+    def assertMatches(self, window, values, criteria):
+        self.assertEqual(values, list(window))
+        self.assertEqual(len(values), len(window))
+        if values:
+            self.assertEqual(min(values), window.min())
+            self.assertEqual(max(values), window.max())
+        self.assertEqual(sum(values), window.sum())
+        self.assertEqual(sum(1 for e in values if criteria(e)), window.count())
+
+    def test_fixed_size(self):
+        rng = random.Random(0)
+        criteria = lambda e: e % 3 == 0
+        window = SlidingWindow(50, criteria, pool_size=8)
+        values = [rng.randrange(20) for _ in range(2000)]
+        for i, e in enumerate(values):
+            window.push_back(e)
+            self.assertMatches(window, values[max(0, i - 49):i + 1], criteria)
+
+    def test_push_and_pop(self):
+        rng = random.Random(1)
+        criteria = lambda e: e > 0
+        window = SlidingWindow(criteria=criteria)
+        values = []
+        for _ in range(3000):
+            if values and rng.random() < 0.45:
+                self.assertEqual(values.pop(0), window.pop_front())
+            else:
+                e = rng.randint(-10, 10)
+                window.push_back(e)
+                values.append(e)
+            self.assertMatches(window, values, criteria)
+
+    def test_duplicates(self):
+        window = SlidingWindow(3)
+        for e in [5, 5, 5, 1, 1, 9, 9, 9, 1]:
+            window.push_back(e)
+        self.assertEqual([9, 9, 1], list(window))
+        self.assertEqual(1, window.min())
+        self.assertEqual(9, window.max())
+        self.assertEqual(9, window.pop_front())
+        self.assertEqual(9, window.max())
+        self.assertEqual(9, window.pop_front())
+        self.assertEqual(1, window.max())
+        self.assertEqual(0, window.count())
+
+    def test_empty(self):
+        window = SlidingWindow(2)
+        self.assertRaises(IndexError, window.min)
+        self.assertRaises(IndexError, window.max)
+        self.assertRaises(IndexError, window.pop_front)
+        window.push_back(2)
+        window.push_back(4)
+        window.clear()
+        self.assertTrue(window.is_empty())
+        self.assertEqual(0, window.sum())
+        self.assertRaises(IndexError, window.min)
+        window.push_back(3)
+        self.assertEqual((3, 3, 3), (window.min(), window.max(), window.sum()))
+
+
+class SpillDequeTests(unittest.TestCase):
+
+    def spill_deque(self, memory_limit=4, segment_size=2):
+        deque = SpillDeque(memory_limit, segment_size)
+        self.addCleanup(deque.close)
+        return deque
+
+    def files(self, deque):
+        return len(os.listdir(deque.directory))
+
+    def test_spills_in_order(self):
+        deque = self.spill_deque()
+        for i in range(10):
+            deque.push_back(i)
+        for i in range(1, 11):
+            deque.push_front(-i)
+        self.assertEqual(list(range(-10, 10)), list(deque))
+        self.assertEqual(20, len(deque))
+        self.assertLessEqual(len(deque.front) + len(deque.back), 4)
+        self.assertEqual(len(deque.segments), self.files(deque))
+        self.assertEqual(16, deque.spilled)
+        self.assertEqual(-10, deque.peek_front())
+        self.assertEqual(9, deque.peek_back())
+
+    def test_pop_across_segments(self):
+        for pop_front in [True, False]:
+            deque = self.spill_deque()
+            for i in range(11):
+                deque.push_back(i)
+            expected = list(range(11))
+            while expected:
+                if pop_front:
+                    self.assertEqual(expected.pop(0), deque.pop_front())
+                else:
+                    self.assertEqual(expected.pop(), deque.pop_back())
+                self.assertEqual(expected, list(deque))
+                self.assertEqual(len(expected), len(deque))
+                self.assertEqual(len(deque.segments), self.files(deque))
+            self.assertRaises(IndexError, deque.pop_front)
+            self.assertRaises(IndexError, deque.pop_back)
+
+    def test_random_operations(self):
+        rng = random.Random(0)
+        deque = self.spill_deque(6, 3)
+        expected = []
+        for step in range(2000):
+            choice = rng.randrange(5)
+            if choice == 0:
+                deque.push_front(step)
+                expected.insert(0, step)
+            elif choice == 1:
+                deque.push_back(step)
+                expected.append(step)
+            elif choice == 2 and expected:
+                self.assertEqual(expected.pop(0), deque.pop_front())
+            elif choice == 3 and expected:
+                self.assertEqual(expected.pop(), deque.pop_back())
+            elif expected:
+                self.assertEqual((expected[0], expected[-1]), (deque.peek_front(), deque.peek_back()))
+            self.assertEqual(len(expected), len(deque))
+            # loading a segment back never leaves more than the limit in memory
+            self.assertLessEqual(len(deque.front) + len(deque.back), 6)
+        self.assertEqual(expected, list(deque))
+        self.assertEqual(len(deque.segments), self.files(deque))
+
+    def test_fill_spills(self):
+        deque = self.spill_deque()
+        for i in range(10):
+            deque.push_back(i)
+        self.assertEqual((0, 4), (len(deque.front), len(deque.back)))
+        # the segment loaded for the front would make six in memory, so the back spills
+        self.assertEqual(0, deque.pop_front())
+        self.assertLessEqual(len(deque.front) + len(deque.back), 4)
+        self.assertEqual(len(deque.segments), self.files(deque))
+        self.assertEqual(list(range(1, 10)), list(deque))
+        self.assertEqual(9, deque.pop_back())
+
+    def test_clear_and_close(self):
+        deque = self.spill_deque()
+        deque.extend(range(12))
+        self.assertGreater(self.files(deque), 0)
+        deque.clear()
+        self.assertEqual(0, self.files(deque))
+        self.assertTrue(deque.is_empty())
+        self.assertEqual([], list(deque))
+        deque.extend(range(12))
+        self.assertEqual(list(range(12)), list(deque))
+        deque.close()
+        self.assertFalse(os.path.exists(deque.directory))
+
+    def test_limits(self):
+        self.assertRaises(ValueError, SpillDeque, 3, 2)
+        self.assertRaises(ValueError, SpillDeque, 4, 0)
+
+
+class BlockDequeTests(unittest.TestCase):
+
+    def test_ends(self):
+        deque = BlockDeque()
+        expected = []
+        for i in range(1000):
+            deque.push_front(-i)
+            deque.push_back(i)
+            expected = [-i] + expected + [i]
+        self.assertEqual(expected, list(deque))
+        self.assertEqual(-999, deque.peek_front())
+        self.assertEqual(999, deque.peek_back())
+        for i in range(len(expected)):
+            self.assertEqual(expected[i], deque[i])
+            self.assertEqual(expected[-i - 1], deque[-i - 1])
+        self.assertRaises(IndexError, deque.__getitem__, len(expected))
+        while expected:
+            self.assertEqual(expected.pop(), deque.pop_back())
+            if expected:
+                self.assertEqual(expected.pop(0), deque.pop_front())
+        self.assertTrue(deque.is_empty())
+        self.assertRaises(IndexError, deque.pop_front)
+        deque.push_back(1)
+        self.assertEqual([1], list(deque))
+
+    def test_random_operations(self):
+        rng = random.Random(0)
+        deque = BlockDeque()
+        expected = list(range(-2000, 0))
+        for i in expected:
+            deque.push_back(i)
+        for step in range(20000):
+            choice = rng.randrange(7)
+            if choice == 0:
+                deque.push_front(step)
+                expected.insert(0, step)
+            elif choice == 1:
+                deque.push_back(step)
+                expected.append(step)
+            elif choice == 2:
+                index = rng.randint(0, len(expected))
+                deque.insert(index, step)
+                expected.insert(index, step)
+            elif choice == 3 and expected:
+                self.assertEqual(expected.pop(0), deque.pop_front())
+            elif choice == 4 and expected:
+                self.assertEqual(expected.pop(), deque.pop_back())
+            elif choice == 5 and expected:
+                start = rng.randint(0, len(expected))
+                end = rng.randint(start, min(len(expected), start + 20))
+                deque.drop_between(start, end)
+                del expected[start:end]
+            elif expected:
+                index = rng.randrange(-len(expected), len(expected))
+                self.assertEqual(expected[index], deque[index])
+            self.assertEqual(len(expected), len(deque))
+        self.assertEqual(expected, list(deque))
+
+    def test_drop_between_all_ranges(self):
+        expected = list(range(300))
+        for start in range(0, 301, 7):
+            for end in range(start, 301, 11):
+                deque = BlockDeque()
+                for i in expected:
+                    deque.push_back(i)
+                deque.drop_between(start, end)
+                remaining = expected[:start] + expected[end:]
+                self.assertEqual(remaining, list(deque), (start, end))
+                self.assertEqual(remaining, [deque[i] for i in range(len(deque))])
+        self.assertRaises(IndexError, BlockDeque().drop_between, 0, 1)
+
+    def test_insert_splits_blocks(self):
+        deque = BlockDeque()
+        deque.push_back('a')
+        deque.push_back('z')
+        for i in range(1000):
+            deque.insert(1, i)
+        self.assertEqual(['a'] + list(range(999, -1, -1)) + ['z'], list(deque))
+        self.assertTrue(all(len(block) <= 2 * deque.block_size() for block in deque.blocks()))
+        self.assertRaises(IndexError, deque.insert, 1003, 0)
+        deque.clear()
+        self.assertEqual([], list(deque))
+
+
+def pipeline_items(producers, count):
+    # the items each producer pushes, distinct across producers
+    return [[(p, i) for i in range(count)] for p in range(producers)]
+
+
+class ConcurrentDequeTests(unittest.TestCase):
+
+    def later(self, delay, function, *args):
+        thread = threading.Timer(delay, function, args)
+        thread.start()
+        self.addCleanup(thread.join)
+
+    def test_blocking_pop(self):
+        deque = ConcurrentDeque()
+        self.later(0.05, deque.push_back, 'a')
+        self.assertEqual('a', deque.pop_front())
+        self.later(0.05, deque.push_front, 'b')
+        self.assertEqual('b', deque.pop_back(timeout=5))
+        self.assertTrue(deque.is_empty())
+
+    def test_timeout_pop(self):
+        deque = ConcurrentDeque()
+        start = time.monotonic()
+        self.assertRaises(IndexError, deque.pop_front, timeout=0.05)
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+        self.assertRaises(IndexError, deque.pop_back, timeout=0.01)
+
+    def test_nonblocking(self):
+        deque = ConcurrentDeque(1)
+        self.assertRaises(IndexError, deque.pop_front, block=False)
+        self.assertRaises(IndexError, deque.pop_back, False)
+        deque.push_back(1, block=False)
+        self.assertRaises(IndexError, deque.push_back, 2, block=False)
+        self.assertRaises(IndexError, deque.push_front, 2, block=False)
+        self.assertEqual(1, deque.pop_front(block=False))
+
+    def test_capacity(self):
+        deque = ConcurrentDeque(2)
+        deque.push_back(1)
+        deque.push_back(2)
+        self.assertRaises(IndexError, deque.push_back, 3, timeout=0.05)
+        self.assertEqual([1, 2], list(deque))
+        # a blocked push goes ahead once a pop makes room
+        self.later(0.05, deque.pop_front)
+        deque.push_front(0, timeout=5)
+        self.assertEqual([0, 2], list(deque))
+        self.later(0.05, deque.clear)
+        deque.push_back(3, timeout=5)
+        self.assertEqual([3], list(deque))
+
+    def test_producers_and_consumers(self):
+        deque = ConcurrentDeque(16)
+        items = pipeline_items(4, 2000)
+        received = [[] for _ in range(4)]
+
+        def consume(out):
+            for _ in range(2000):
+                out.append(deque.pop_front(timeout=10))
+
+        threads = [threading.Thread(target=consume, args=(out,)) for out in received]
+        threads += [threading.Thread(target=lambda batch=batch: [deque.push_back(e, timeout=10) for e in batch])
+                    for batch in items]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(sum(items, [])), sorted(sum(received, [])))
+        # each consumer sees each producer's items in the order they were pushed
+        for out in received:
+            for p in range(4):
+                mine = [i for (q, i) in out if q == p]
+                self.assertEqual(sorted(mine), mine)
+        self.assertTrue(deque.is_empty())
+
+
+class AsyncDequeTests(unittest.TestCase):
+
+    def run_async(self, coroutine):
+        return asyncio.run(asyncio.wait_for(coroutine, 10))
+
+    def test_blocking_pop(self):
+        async def check():
+            deque = AsyncDeque()
+            task = asyncio.ensure_future(deque.pop_front())
+            await asyncio.sleep(0)
+            self.assertFalse(task.done())
+            await deque.push_back('a')
+            self.assertEqual('a', await task)
+            task = asyncio.ensure_future(deque.pop_back())
+            await asyncio.sleep(0)
+            deque.push_front_nowait('b')
+            self.assertEqual('b', await task)
+        self.run_async(check())
+
+    def test_timeout_pop(self):
+        async def check():
+            deque = AsyncDeque()
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(deque.pop_front(), 0.01)
+            # the timed out waiter does not take the next element
+            deque.push_back_nowait(1)
+            self.assertEqual(1, await deque.pop_front())
+        self.run_async(check())
+
+    def test_nowait(self):
+        deque = AsyncDeque(1)
+        self.assertRaises(IndexError, deque.pop_front_nowait)
+        self.assertRaises(IndexError, deque.pop_back_nowait)
+        deque.push_back_nowait(1)
+        self.assertRaises(IndexError, deque.push_back_nowait, 2)
+        self.assertRaises(IndexError, deque.push_front_nowait, 2)
+        self.assertEqual(1, deque.pop_back_nowait())
+
+    def test_capacity(self):
+        async def check():
+            deque = AsyncDeque(2)
+            await deque.push_back(1)
+            await deque.push_back(2)
+            task = asyncio.ensure_future(deque.push_back(3))
+            await asyncio.sleep(0)
+            self.assertFalse(task.done())
+            self.assertEqual(1, await deque.pop_front())
+            await task
+            self.assertEqual([2, 3], list(deque))
+        self.run_async(check())
+
+    def test_producers_and_consumers(self):
+        async def check():
+            deque = AsyncDeque(16)
+            items = pipeline_items(4, 2000)
+
+            async def produce(batch):
+                for e in batch:
+                    await deque.push_back(e)
+
+            async def consume():
+                return [await deque.pop_front() for _ in range(2000)]
+
+            results = await asyncio.gather(*[consume() for _ in range(4)],
+                                           *[produce(batch) for batch in items])
+            self.assertEqual(sorted(sum(items, [])), sorted(sum(results[:4], [])))
+            self.assertTrue(deque.is_empty())
+        self.run_async(check())
+
+    def test_cancelled_waiter_passes_on_wake_up(self):
+        async def check():
+            deque = AsyncDeque()
+            first = asyncio.ensure_future(deque.pop_front())
+            second = asyncio.ensure_future(deque.pop_front())
+            await asyncio.sleep(0)
+            # first is woken for the element, then cancelled before it runs
+            deque.push_back_nowait('a')
+            first.cancel()
+            self.assertEqual('a', await asyncio.wait_for(second, 1))
+            self.assertTrue(first.cancelled())
+            # the same for pushes waiting for room
+            deque = AsyncDeque(1)
+            deque.push_back_nowait(0)
+            first = asyncio.ensure_future(deque.push_back(1))
+            second = asyncio.ensure_future(deque.push_back(2))
+            await asyncio.sleep(0)
+            deque.pop_front_nowait()
+            first.cancel()
+            await asyncio.wait_for(second, 1)
+            self.assertEqual([2], list(deque))
+        self.run_async(check())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,476 @@
+#!/usr/bin/python3
+"""
+Benchmarks for the deques
+Run with a list of operation counts, e.g. python3 benchmarks.py 1000000 10000000
+"""
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from Deque import Deque, ArrayDeque, BlockDeque, Node
+from ConcurrentDeque import ConcurrentDeque, AsyncDeque
+from Main2 import compile_script, execute
+from SlidingWindow import SlidingWindow
+from SpillDeque import SpillDeque
+
+def timed(function, *args):
+    """
+    Times a single call
+    :param function: the function to call
+    :param args: arguments for the function
+    :return: the seconds taken and the function's result
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+class DictNode:
+    """
+    The old Node with a per-instance __dict__, kept for comparison
+    """
+    def __init__(self, data):
+        self.data = data
+        self.next_node = None
+        self.prev_node = None
+
+def measured(function, *args):
+    """
+    Measures the memory held by the result of a single call
+    :param function: the function to call
+    :param args: arguments for the function
+    :return: the bytes allocated and still alive after the call
+    """
+    tracemalloc.start()
+    result = function(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+def filled(cls, n):
+    """
+    Builds a deque holding n elements
+    :param cls: a deque class
+    :param n: the number of elements
+    :return: the deque
+    """
+    deque = cls()
+    for i in range(n):
+        deque.push_back(i)
+    return deque
+
+def command_churn(deque, n):
+    """
+    Replays the shape of a Main2 command stream: bursts of pushes at both ends drained by pops
+    :param deque: an empty deque
+    :param n: the number of elements
+    """
+    for i in range(0, n, 64):
+        for j in range(32):
+            deque.push_front(j)
+            deque.push_back(j)
+        for _ in range(32):
+            deque.pop_back()
+            deque.pop_front()
+
+def queue_churn(deque, n):
+    """
+    Pushes n elements at the back and pops them from the front, a few at a time
+    :param deque: an empty deque
+    :param n: the number of elements
+    """
+    for i in range(n):
+        deque.push_back(i)
+        if i % 4 == 3:
+            for _ in range(4):
+                deque.pop_front()
+
+def stack_churn(deque, n):
+    """
+    Fills the deque at the front with n elements, then empties it from the back
+    :param deque: an empty deque
+    :param n: the number of elements
+    """
+    for i in range(n):
+        deque.push_front(i)
+    for _ in range(n):
+        deque.pop_back()
+
+def iterate(deque, n):
+    """
+    Fills the deque with n elements and iterates over it
+    :param deque: an empty deque
+    :param n: the number of elements
+    """
+    for i in range(n):
+        deque.push_back(i)
+    for _ in deque:
+        pass
+
+def bench_deques(sizes, classes):
+    """
+    Times each workload on each kind of deque
+    :param sizes: a list of operation counts
+    :param classes: a list of deque classes
+    """
+    workloads = [queue_churn, stack_churn, iterate]
+    print('{0:>10} {1:>12} {2:>12} {3:>10} {4:>12}'.format('n', 'deque', 'workload', 'time (s)', 'ops/s'))
+    for n in sizes:
+        for workload in workloads:
+            for cls in classes:
+                run_time, _ = timed(workload, cls(), n)
+                print('{0:>10} {1:>12} {2:>12} {3:>10.3f} {4:>12.0f}'.format(
+                    n, cls.__name__, workload.__name__, run_time, 2 * n / run_time))
+
+def bench_memory(sizes):
+    """
+    Compares the memory of dict nodes, slotted nodes and full deques of ints
+    :param sizes: a list of element counts
+    """
+    print('{0:>10} {1:>12} {2:>14} {3:>14}'.format('n', 'storage', 'bytes', 'bytes/element'))
+    for n in sizes:
+        storages = [
+            ('dict nodes', lambda: [DictNode(None) for _ in range(n)]),
+            ('slot nodes', lambda: [Node(None) for _ in range(n)]),
+            ('Deque', lambda: filled(Deque, n)),
+            ('ArrayDeque', lambda: filled(ArrayDeque, n)),
+        ]
+        for name, build in storages:
+            size = measured(build)
+            print('{0:>10} {1:>12} {2:>14} {3:>14.1f}'.format(n, name, size, size / n))
+
+def bench_pool(sizes):
+    """
+    Compares churn workloads on a Deque with and without a node pool
+    :param sizes: a list of operation counts
+    """
+    print('{0:>10} {1:>12} {2:>14} {3:>10} {4:>12}'.format('n', 'pool', 'workload', 'time (s)', 'ops/s'))
+    for n in sizes:
+        for workload in [queue_churn, command_churn]:
+            for pool_size in [0, 1024]:
+                run_time, _ = timed(workload, Deque(pool_size), n)
+                print('{0:>10} {1:>12} {2:>14} {3:>10.3f} {4:>12.0f}'.format(
+                    n, pool_size, workload.__name__, run_time, 2 * n / run_time))
+
+def trim_middle(deque, n, trims=100):
+    """
+    Fills the deque with n elements, then drops short ranges from its middle
+    :param deque: an empty deque
+    :param n: the number of elements
+    :param trims: the number of ranges to drop
+    """
+    for i in range(n):
+        deque.push_back(i)
+    for _ in range(trims):
+        middle = len(deque) // 2
+        deque.drop_between(middle, min(middle + 10, len(deque)))
+
+def front_and_index(deque, n):
+    """
+    Pushes n elements to the front of a BlockDeque, reading a middle element and inserting near it every 100
+    :param deque: an empty BlockDeque
+    :param n: the number of elements
+    """
+    for i in range(n):
+        deque.push_front(i)
+        if i % 100 == 0:
+            middle = len(deque) // 2
+            deque.insert(middle, deque[middle])
+
+def bench_trim(sizes):
+    """
+    Times dropping ranges from the middle of long deques and indexing a BlockDeque
+    :param sizes: a list of element counts
+    """
+    print('{0:>10} {1:>12} {2:>14} {3:>10}'.format('n', 'deque', 'workload', 'time (s)'))
+    for n in sizes:
+        for cls in [Deque, ArrayDeque, BlockDeque]:
+            run_time, _ = timed(trim_middle, cls(), n)
+            print('{0:>10} {1:>12} {2:>14} {3:>10.3f}'.format(n, cls.__name__, 'trim_middle', run_time))
+        deque = filled(BlockDeque, n)
+        run_time, _ = timed(lambda: [deque[i] for i in range(0, n, max(1, n // 100000))])
+        print('{0:>10} {1:>12} {2:>14} {3:>10.3f}'.format(n, 'BlockDeque', 'index', run_time))
+        run_time, _ = timed(front_and_index, BlockDeque(), n)
+        print('{0:>10} {1:>12} {2:>14} {3:>10.3f}'.format(n, 'BlockDeque', 'front_and_index', run_time))
+
+def push_each(deque, other):
+    """
+    The old extend, one push_back per element, kept for comparison
+    :param deque: a Deque
+    :param other: an iterable of elements
+    """
+    for e in other:
+        deque.push_back(e)
+
+def bench_concat(sizes):
+    """
+    Times concatenating two deques of n elements each way
+    :param sizes: a list of element counts
+    """
+    print('{0:>10} {1:>14} {2:>10}'.format('n', 'concat', 'time (s)'))
+    for n in sizes:
+        ways = [('push_back', push_each),
+                ('extend', Deque.extend),
+                ('extend steal', lambda deque, other: deque.extend(other, True))]
+        for name, concat in ways:
+            deque = filled(Deque, n)
+            other = filled(Deque, n)
+            run_time, _ = timed(concat, deque, other)
+            print('{0:>10} {1:>14} {2:>10.4f}'.format(n, name, run_time))
+        run_time, _ = timed(filled(Deque, 2 * n).split_at, n)
+        print('{0:>10} {1:>14} {2:>10.4f}'.format(n, 'split_at', run_time))
+
+def thread_pipeline(n, producers, consumers, capacity):
+    """
+    Passes n elements from producer threads to consumer threads through a ConcurrentDeque
+    :param n: the number of elements
+    :param producers: the number of producer threads
+    :param consumers: the number of consumer threads
+    :param capacity: the capacity of the deque
+    """
+    deque = ConcurrentDeque(capacity)
+    def produce(count):
+        for i in range(count):
+            deque.push_back(i)
+    def consume(count):
+        for _ in range(count):
+            deque.pop_front()
+    threads = [threading.Thread(target=produce, args=(n // producers,)) for _ in range(producers)]
+    threads += [threading.Thread(target=consume, args=(n // consumers,)) for _ in range(consumers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+async def task_pipeline(n, producers, consumers, capacity):
+    """
+    Passes n elements from producer tasks to consumer tasks through an AsyncDeque
+    :param n: the number of elements
+    :param producers: the number of producer tasks
+    :param consumers: the number of consumer tasks
+    :param capacity: the capacity of the deque
+    """
+    deque = AsyncDeque(capacity)
+    async def produce(count):
+        for i in range(count):
+            await deque.push_back(i)
+    async def consume(count):
+        for _ in range(count):
+            await deque.pop_front()
+    await asyncio.gather(*[produce(n // producers) for _ in range(producers)],
+                         *[consume(n // consumers) for _ in range(consumers)])
+
+def bench_contention(sizes, capacity=1024):
+    """
+    Times producer/consumer pipelines over the thread-safe and asyncio deques
+    :param sizes: a list of element counts, rounded down to a multiple of 12
+    :param capacity: the capacity of the deques
+    """
+    print('{0:>10} {1:>12} {2:>10} {3:>10} {4:>12}'.format('n', 'deque', 'prod/cons', 'time (s)', 'ops/s'))
+    for n in sizes:
+        n -= n % 12
+        for producers, consumers in [(1, 1), (4, 4), (2, 6)]:
+            run_time, _ = timed(thread_pipeline, n, producers, consumers, capacity)
+            print('{0:>10} {1:>12} {2:>10} {3:>10.3f} {4:>12.0f}'.format(
+                n, 'Concurrent', '{0}/{1}'.format(producers, consumers), run_time, 2 * n / run_time))
+            run_time, _ = timed(asyncio.run, task_pipeline(n, producers, consumers, capacity))
+            print('{0:>10} {1:>12} {2:>10} {3:>10.3f} {4:>12.0f}'.format(
+                n, 'Async', '{0}/{1}'.format(producers, consumers), run_time, 2 * n / run_time))
+
+def run_each(filename):
+    """
+    The old Main2.main, one dispatch and split per line, kept for comparison
+    :param filename: a command file
+    """
+    deque = Deque()
+    with open(filename, 'r') as reader:
+        for line in reader:
+            line = line.strip()
+            if line.startswith('+f'):
+                deque.push_front(line.split()[1])
+            elif line.startswith('+b'):
+                deque.push_back(line.split()[1])
+            elif line == '-f':
+                deque.pop_front()
+            elif line == '-b':
+                deque.pop_back()
+            elif line == 'clear':
+                deque.clear()
+            elif line == 'print':
+                print(deque)
+            elif line == 'len':
+                print('length:', len(deque))
+            elif line.startswith('count'):
+                deque.count_if(lambda s : line.split()[1] in s)
+            elif line.startswith('keep'):
+                deque.drop_between(int(line.split()[1]),int(line.split()[2]))
+            else:
+                raise KeyError(line)
+
+def run_compiled(filename):
+    """
+    Compiles a command file and executes it
+    :param filename: a command file
+    """
+    with open(filename, 'r') as reader:
+        execute(compile_script(reader))
+
+def write_script(filename, n, seed=0):
+    """
+    Writes a random command file of about n lines: bursts of pushes and pops with the odd len and keep
+    :param filename: where to write the commands
+    :param n: the number of lines
+    :param seed: the random seed
+    """
+    rng = random.Random(seed)
+    lines = []
+    size = 0
+    while len(lines) < n:
+        for _ in range(rng.randint(1, 64)):
+            lines.append(rng.choice(['+f', '+b']) + ' w' + str(rng.randrange(1000)))
+            size += 1
+        for _ in range(rng.randint(0, size)):
+            lines.append(rng.choice(['-f', '-b']))
+            size -= 1
+        if rng.random() < 0.01:
+            lines.append('len')
+        if rng.random() < 0.01 and size > 1:
+            start = rng.randrange(size)
+            end = min(size, start + 10)
+            lines.append('keep {0} {1}'.format(start, end))
+            size -= end - start
+    with open(filename, 'w') as writer:
+        writer.write('\n'.join(lines) + '\n')
+
+def bench_script(sizes):
+    """
+    Times running Main2 command files line by line and compiled, checking both print the same
+    :param sizes: a list of line counts
+    """
+    print('{0:>10} {1:>12} {2:>10} {3:>12}'.format('n', 'executor', 'time (s)', 'ops/s'))
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'script.txt')
+            write_script(filename, n)
+            outputs = []
+            for run in [run_each, run_compiled]:
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    run_time, _ = timed(run, filename)
+                outputs.append(output.getvalue())
+                print('{0:>10} {1:>12} {2:>10.3f} {3:>12.0f}'.format(n, run.__name__, run_time, n / run_time))
+            if outputs[0] != outputs[1]:
+                print('outputs differ')
+
+def ticks(n, seed=0):
+    """
+    A stream of metric values, a random walk
+    :param n: the number of ticks
+    :param seed: the random seed
+    :return: a list of ints
+    """
+    rng = random.Random(seed)
+    values = []
+    value = 0
+    for _ in range(n):
+        value += rng.randint(-5, 5)
+        values.append(value)
+    return values
+
+def scan_window(values, size):
+    """
+    The old way, a Deque as the window and a full pass per aggregate on every tick
+    :param values: the stream
+    :param size: the window size
+    """
+    window = Deque()
+    for value in values:
+        window.push_back(value)
+        if len(window) > size:
+            window.pop_front()
+        min(window), max(window), sum(window), window.count_if(lambda v: v > 0)
+
+def slide_window(values, size):
+    """
+    A SlidingWindow over the stream, reading every aggregate on every tick
+    :param values: the stream
+    :param size: the window size
+    """
+    window = SlidingWindow(size, lambda v: v > 0)
+    for value in values:
+        window.push_back(value)
+        window.min(), window.max(), window.sum(), window.count()
+
+def bench_window(sizes, window=1000, scan_limit=10000):
+    """
+    Times windowed min/max/sum/count over streams of n ticks, e.g. 10000000
+    The full scans are only run on the first scan_limit ticks, they are O(window) a tick
+    :param sizes: a list of tick counts
+    :param window: the window size
+    :param scan_limit: the most ticks to run the full scans on
+    """
+    print('{0:>10} {1:>14} {2:>10} {3:>12}'.format('ticks', 'window', 'time (s)', 'ticks/s'))
+    for n in sizes:
+        values = ticks(n)
+        for run, count in [(scan_window, min(n, scan_limit)), (slide_window, n)]:
+            run_time, _ = timed(run, values[:count], window)
+            print('{0:>10} {1:>14} {2:>10.3f} {3:>12.0f}'.format(count, run.__name__, run_time, count / run_time))
+
+def backlog(deque, n):
+    """
+    A queue whose consumer falls behind: n pushes at the back, then n pops from the front
+    :param deque: an empty deque
+    :param n: the number of elements
+    """
+    for i in range(n):
+        deque.push_back((i, 'job'))
+    for _ in range(n):
+        deque.pop_front()
+
+def peak(function, *args):
+    """
+    Measures the most memory allocated at once during a single call
+    :param function: the function to call
+    :param args: arguments for the function
+    :return: the peak bytes
+    """
+    tracemalloc.start()
+    function(*args)
+    size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size
+
+def bench_spill(sizes, memory_limit=2**16):
+    """
+    Times and measures a backlog on a Deque and on a SpillDeque that pages out past memory_limit elements
+    :param sizes: a list of element counts
+    :param memory_limit: the SpillDeque memory cap, in elements
+    """
+    print('{0:>10} {1:>12} {2:>10} {3:>12} {4:>12}'.format('n', 'deque', 'time (s)', 'ops/s', 'peak MB'))
+    for n in sizes:
+        for name, make in [('Deque', Deque), ('SpillDeque', lambda: SpillDeque(memory_limit))]:
+            run_time, _ = timed(backlog, make(), n)
+            size = peak(backlog, make(), n)
+            print('{0:>10} {1:>12} {2:>10.3f} {3:>12.0f} {4:>12.1f}'.format(
+                n, name, run_time, 2 * n / run_time, size / 2**20))
+
+def main(sizes):
+    bench_deques(sizes, [Deque, ArrayDeque, BlockDeque])
+    bench_memory(sizes)
+    bench_pool(sizes)
+    bench_trim(sizes)
+    bench_concat(sizes)
+    bench_contention(sizes)
+    bench_script(sizes)
+    bench_window(sizes)
+    bench_spill(sizes)
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 1000000])
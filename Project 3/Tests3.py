@@ -18,6 +18,10 @@ def natural_order(x, y):
 def reverse_order(x, y):
     return natural_order(y, x)
 
+
+def case_insensitive_order(x, y):
+    return natural_order(x.lower(), y.lower())
+
 class TreeSetTests(unittest.TestCase):
 
     def test_is_empty(self):
@@ -218,6 +222,122 @@ class TreeSetTests(unittest.TestCase):
         self.assertTrue(tree.insert(5))
         self.assertEqual(1, len(tree))
 
+    def test_balanced(self):
+        import math
+        tree = TreeSet(natural_order)
+        for i in range(0, 1024):
+            tree.insert(i)
+            self.assertLessEqual(math.floor(math.log2(i + 1)), tree.height())
+            self.assertGreaterEqual(1.44 * math.log2(i + 2), tree.height())
+        for i in range(0, 1024, 2):
+            self.assertTrue(tree.remove(i))
+            self.assertGreaterEqual(1.44 * math.log2(len(tree) + 2), tree.height())
+        self.assertEqual(list(range(1, 1024, 2)), [x for x in tree])
+
+    def test_unbalanced(self):
+        tree = TreeSet(natural_order, balanced=False)
+        for i in range(0, 100):
+            tree.insert(i)
+        self.assertEqual(99, tree.height())
+        self.assertEqual(100, len(tree))
+        self.assertTrue(tree.remove(99))
+        self.assertEqual(98, tree.height())
+
+    def test_deep(self):
+        # A plain tree of sorted keys is far deeper than the recursion limit
+        tree = TreeSet(natural_order, balanced=False)
+        for i in range(0, 2000):
+            tree.insert(i)
+        self.assertTrue(1999 in tree)
+        self.assertFalse(2000 in tree)
+        self.assertEqual(0, tree.first())
+        self.assertEqual(1999, tree.last())
+        self.assertEqual(list(range(0, 2000)), [x for x in tree])
+        self.assertTrue(tree.remove(1000))
+        self.assertEqual(1999, len(tree))
+
+    def test_iter_lazy(self):
+        tree = TreeSet(natural_order)
+        for i in range(0, 100):
+            tree.insert(i)
+        items = iter(tree)
+        self.assertEqual(0, next(items))
+        self.assertEqual(1, next(items))
+        self.assertEqual(list(range(2, 100)), list(items))
+        self.assertEqual([], list(TreeSet(natural_order)))
+
+    def test_union(self):
+        tree1 = TreeSet(natural_order)
+        tree2 = TreeSet(natural_order)
+        for item in [1, 3, 5, 7, 9]:
+            tree1.insert(item)
+        for item in [2, 3, 4, 5, 10]:
+            tree2.insert(item)
+        union = tree1.union(tree2)
+        self.assertEqual([1, 2, 3, 4, 5, 7, 9, 10], [x for x in union])
+        self.assertEqual(8, len(union))
+        self.assertGreaterEqual(3, union.height())
+        self.assertEqual([1, 3, 5, 7, 9], [x for x in tree1])
+        self.assertEqual([2, 3, 4, 5, 10], [x for x in tree2])
+        self.assertTrue(union.insert(6))
+        self.assertTrue(union.remove(1))
+        self.assertEqual([2, 3, 4, 5, 6, 7, 9, 10], [x for x in union])
+
+    def test_intersection(self):
+        tree1 = TreeSet(natural_order)
+        tree2 = TreeSet(natural_order)
+        tree3 = TreeSet(natural_order)
+        for item in range(0, 100):
+            tree1.insert(item)
+        for item in range(50, 150, 5):
+            tree2.insert(item)
+        tree3.insert(42)
+        self.assertEqual(list(range(50, 100, 5)), [x for x in tree1.intersection(tree2)])
+        self.assertEqual(list(range(50, 100, 5)), [x for x in tree2.intersection(tree1)])
+        self.assertEqual([42], [x for x in tree1.intersection(tree3)])
+        self.assertEqual([42], [x for x in tree3.intersection(tree1)])
+        self.assertTrue(tree2.intersection(tree3).is_empty())
+
+    def test_difference(self):
+        tree1 = TreeSet(natural_order)
+        tree2 = TreeSet(natural_order)
+        tree3 = TreeSet(natural_order)
+        for item in range(0, 100):
+            tree1.insert(item)
+        for item in range(0, 150, 2):
+            tree2.insert(item)
+        tree3.insert(1)
+        self.assertEqual(list(range(1, 100, 2)), [x for x in tree1.difference(tree2)])
+        self.assertEqual(list(range(100, 150, 2)), [x for x in tree2.difference(tree1)])
+        self.assertEqual([], [x for x in tree3.difference(tree1)])
+        self.assertEqual([0] + list(range(2, 100)), [x for x in tree1.difference(tree3)])
+
+    def test_set_ops_keep_self(self):
+        tree1 = TreeSet(case_insensitive_order)
+        tree2 = TreeSet(case_insensitive_order)
+        for item in ['Alfa', 'bravo', 'Charlie']:
+            tree1.insert(item)
+        for item in ['alfa', 'Bravo', 'delta']:
+            tree2.insert(item)
+        self.assertEqual(['Alfa', 'bravo', 'Charlie', 'delta'], [x for x in tree1.union(tree2)])
+        self.assertEqual(['Alfa', 'bravo'], [x for x in tree1.intersection(tree2)])
+        self.assertEqual(['alfa', 'Bravo'], [x for x in tree2.intersection(tree1)])
+        self.assertEqual(['Charlie'], [x for x in tree1.difference(tree2)])
+        self.assertFalse(tree1.is_disjoint(tree2))
+
+    def test_disjoint_sizes(self):
+        tree1 = TreeSet(natural_order)
+        tree2 = TreeSet(natural_order)
+        for item in range(0, 1000, 2):
+            tree1.insert(item)
+        tree2.insert(501)
+        self.assertTrue(tree1.is_disjoint(tree2))
+        self.assertTrue(tree2.is_disjoint(tree1))
+        tree2.insert(500)
+        self.assertFalse(tree1.is_disjoint(tree2))
+        self.assertFalse(tree2.is_disjoint(tree1))
+        self.assertTrue(tree1.is_disjoint(TreeSet(natural_order)))
+
 
 if __name__ == '__main__':
     unittest.main()
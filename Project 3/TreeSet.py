@@ -3,20 +3,20 @@ Algorithm to implement a tree set used to track membership in a group. Items wil
 based on a comparison function supplied to the tree upon creation.
 Method to balance tree: using comp. Same as a binary search tree. For each parent, the left
 child's value is smaller while the right child's value is larger.
+By default the tree is kept AVL balanced: after each insert or remove, the heights of the
+two subtrees of every node differ by at most one, so the tree height stays O(log n).
 """
 
 def get_node_height(node):
     """
     Returns the height of a given node
     :param: A node to get the height of
-    :return: An integer
+    :return: An integer, 0 for a leaf and -1 for no node
     """
     if node is not None:
-        left_height = get_node_height(node.left)
-        right_height = get_node_height(node.right)
-        return 1 + max(left_height, right_height)
+        return node.height
     else:
-        return 0
+        return -1
 
 class TreeSet:
     """
@@ -25,30 +25,32 @@ class TreeSet:
     function rather than their natural order.
     """
 
-    def __init__(self, comp):
+    def __init__(self, comp, balanced=True):
         """
         Constructor for the tree set.
         You can perform additional setup steps here
         :param comp: A comparison function over two elements
+        :param balanced: Keep the tree AVL balanced, False for a plain binary search tree
         """
         self.comp = comp        # Function to compare nodes
         # added stuff below
         self.head = None        # Head of the tree
-        self.i_height = -1      # Store initial height
+        self.size = 0           # Number of nodes
+        self.balanced = balanced
 
     def __len__(self):
         """
         Counts the number of elements in the tree
         :return: The length of the tree
         """
-        return self.i_height + 1    # Length is height + 1
+        return self.size
 
     def height(self):
         """
         Finds the height of the tree
-        :return: The height of the tree
+        :return: The height of the tree, -1 when empty
         """
-        return self.i_height        # Return stored height
+        return get_node_height(self.head)   # Heights are stored in the nodes
 
     def insert(self, item):
         """
@@ -59,8 +61,8 @@ class TreeSet:
         #True if inserted, False if already in tree (no repeated elements)
         new_node = TreeNode(item)       # Make new node
         if self.head is None:           # Empty tree
-            self.head = new_node        # Update head, inc. height, rebalance tree
-            self.i_height += 1
+            self.head = new_node        # Update head, inc. size
+            self.size += 1
             return True
         else:
             node = self.find_insertion_node(self.head, new_node)
@@ -73,9 +75,9 @@ class TreeSet:
                 else:
                     node.left = new_node
                     new_node.parent = node
-                # Inc. height and rebalance tree
-                self.i_height += 1
-                self.rebalance(new_node)
+                # Inc. size and rebalance tree from the parent up
+                self.size += 1
+                self.rebalance(node)
                 return True
             else:
                 return False
@@ -88,50 +90,33 @@ class TreeSet:
         """
         # True if removed, False if node not in tree
         # Nothing to remove
-        if self.i_height == -1:
+        if self.head is None:
             return False
         node = self.find_node(self.head, TreeNode(item))
-        # Node exists
-        if node is not None:
-            self.i_height -= 1
-            child = None
-            parent = node.parent
-
-            if node.left is not None and node.right is not None:
-                #Node has two kids
-                swap = node.least_successor()
-                node.data = swap.data
-
-                # Update parent
-                if swap is swap.parent.left:
-                    swap.parent.left = swap.right
-
-                if swap is swap.parent.right:
-                    swap.parent.right = swap.right
-            else:
-                # Node has one or no kids
-                # Get the kid
-                if node.left is None and node.right is not None:
-                    child = node.right
-                elif node.right is None and node.left is not None:
-                    child = node.left
-
-                # Update the head
-                if node.data == self.head.data:
-                    self.head = child
-                # Update parent's child
-                elif parent.left is not None and node.data == parent.left.data:
-                    parent.left = child
-                elif parent.right is not None and node.data == parent.right.data:
-                    parent.right = child
-                # Update child's parent
-                if child is not None:
-                    child.parent = parent
-            self.rebalance(parent)
-            return True
         # If did not remove a node
-        else:
+        if node is None:
             return False
+        self.size -= 1
+        if node.left is not None and node.right is not None:
+            # Node has two kids, take the successor's data and unlink the successor instead
+            swap = node.least_successor()
+            node.data = swap.data
+            node = swap
+        # Node has one or no kids
+        child = node.left if node.left is not None else node.right
+        parent = node.parent
+        # Update child's parent
+        if child is not None:
+            child.parent = parent
+        # Update the head or the parent's child
+        if parent is None:
+            self.head = child
+        elif node is parent.left:
+            parent.left = child
+        else:
+            parent.right = child
+        self.rebalance(parent)
+        return True
 
     def __contains__(self, item):
         """
@@ -174,21 +159,27 @@ class TreeSet:
         """
         Empties the tree
         """
-        # Clear the head and reset the height
+        # Clear the head and reset the size
         self.head = None
-        self.i_height = -1
+        self.size = 0
 
     def __iter__(self):
         """
-        Does an in-order traversal of the tree
+        Does an in-order traversal of the tree, one node at a time
+        Follows parent pointers, so it needs no stack or list
         :return: an iterator of the tree
         """
-        return iter(self.build_list(self.head))
+        if self.head is None:
+            return
+        node = self.head.search_left()
+        while node is not None:
+            yield node.data
+            node = node.successor()
 
     def is_disjoint(self, other):
         """
         Check if two TreeSet is disjoint
-        :param other: A TreeSet object
+        :param other: A TreeSet object ordered by the same comparison
         :return: True if the sets have no elements in common
         """
         #check if self and other TreeSet have any elements in common
@@ -197,15 +188,45 @@ class TreeSet:
         #Check if either tree is empty
         if other.head is None or self.head is None:
             return True
-        # Make list of nodes in other
-        other_list = other.build_list(other.head)
-        # Compare each node in other to self
-        for i in other_list:
-            new_node = TreeNode(i)
-            exist = self.find_node(self.head, new_node)
-            if exist is not None:
-                return False
-        return True
+        # Look up the items of a much smaller set, otherwise walk both
+        small, large = sorted((self, other), key=len)
+        if self.use_lookups(len(small), len(large)):
+            return not any(item in large for item in small)
+        return not any(in_self and in_other for _, in_self, in_other in self.walk_both(other))
+
+    def union(self, other):
+        """
+        Makes the set of items in either tree
+        :param other: A TreeSet object ordered by the same comparison
+        :return: A new TreeSet, holding self's item where both have one
+        """
+        return self.build_set(item for item, _, _ in self.walk_both(other))
+
+    def intersection(self, other):
+        """
+        Makes the set of items in both trees
+        :param other: A TreeSet object ordered by the same comparison
+        :return: A new TreeSet, holding self's items
+        """
+        if self.use_lookups(len(other), len(self)):
+            # Few items to look for, keep self's version of each one found
+            found = (self.find_node(self.head, TreeNode(item)) for item in other)
+            return self.build_set(node.data for node in found if node is not None)
+        if self.use_lookups(len(self), len(other)):
+            return self.build_set(item for item in self if item in other)
+        return self.build_set(item for item, in_self, in_other in self.walk_both(other)
+                              if in_self and in_other)
+
+    def difference(self, other):
+        """
+        Makes the set of items in self but not in other
+        :param other: A TreeSet object ordered by the same comparison
+        :return: A new TreeSet
+        """
+        if self.use_lookups(len(self), len(other)):
+            return self.build_set(item for item in self if item not in other)
+        return self.build_set(item for item, in_self, in_other in self.walk_both(other)
+                              if not in_other)
 
     # Pre-defined methods
 
@@ -233,6 +254,80 @@ class TreeSet:
     # Helper functions
     # You can add additional functions here
 
+    @staticmethod
+    def use_lookups(small, large):
+        """
+        Decides between looking up each item of one set in another and walking both at once
+        :param small: the number of items to look up
+        :param large: the number of items in the set searched
+        :return: True if the lookups take fewer comparisons than the walk
+        """
+        return small * large.bit_length() < small + large
+
+    def walk_both(self, other):
+        """
+        Walks this tree and another in order at once, like a merge
+        :param other: A TreeSet object ordered by the same comparison
+        :return: an iterator of (item, in self, in other), the item is self's when in both
+        """
+        comp = self.comp
+        mine = iter(self)
+        theirs = iter(other)
+        end = object()
+        a = next(mine, end)
+        b = next(theirs, end)
+        while a is not end and b is not end:
+            result = comp(a, b)
+            if result < 0:
+                yield a, True, False
+                a = next(mine, end)
+            elif result > 0:
+                yield b, False, True
+                b = next(theirs, end)
+            else:
+                yield a, True, True
+                a = next(mine, end)
+                b = next(theirs, end)
+        # One side is used up, the rest of the other follows
+        while a is not end:
+            yield a, True, False
+            a = next(mine, end)
+        while b is not end:
+            yield b, False, True
+            b = next(theirs, end)
+
+    def build_set(self, items):
+        """
+        Makes a new tree with this tree's comparison from items already in order
+        The tree is built perfectly balanced, without comparisons or rotations
+        :param items: an iterable of distinct items in increasing order
+        :return: A new TreeSet
+        """
+        tree = TreeSet(self.comp, self.balanced)
+        items = list(items)
+        tree.head = self.build_subtree(items, 0, len(items), None)
+        tree.size = len(items)
+        return tree
+
+    def build_subtree(self, items, low, high, parent):
+        """
+        Links the items in [low, high) into a balanced subtree
+        :param items: a list of items in increasing order
+        :param low: the first position to use
+        :param high: the position after the last one to use
+        :param parent: the node the subtree hangs from
+        :return: The root of the subtree, None when the range is empty
+        """
+        if low >= high:
+            return None
+        middle = (low + high) // 2
+        node = TreeNode(items[middle])
+        node.parent = parent
+        node.left = self.build_subtree(items, low, middle, node)
+        node.right = self.build_subtree(items, middle + 1, high, node)
+        node.update_height()
+        return node
+
     def build_list(self, start):
         """
         Creates an in-order list of items in the tree
@@ -240,11 +335,17 @@ class TreeSet:
         :return: list of items in the tree
         """
         return_list = []
-        if start is not None:
-            # In-order traversal is left, parent, right
-            return_list.extend(self.build_list(start.left))
-            return_list.append(start.data)
-            return_list.extend(self.build_list(start.right))
+        stack = []
+        node = start
+        # In-order traversal is left, parent, right
+        while node is not None or stack:
+            # Go as far left as possible, remembering the way back up
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            return_list.append(node.data)
+            node = node.right
         return return_list
 
     def find_node(self, node, item):
@@ -254,21 +355,18 @@ class TreeSet:
         :param item: node to look for
         :return: The node if exists, None if does not
         """
-        result = self.comp(item.data, node.data)
-        # Found the node
-        if result == 0:
-            return node
-        # Look down left or right side depending on comp result
-        elif result < 0:
-            if node.left is None:
-                return None
-            else:
-                return self.find_node(node.left, item)
-        elif result > 0:
-            if node.right is None:
-                return None
+        comp = self.comp
+        data = item.data
+        while node is not None:
+            result = comp(data, node.data)
+            # Found the node
+            if result == 0:
+                return node
+            # Look down left or right side depending on comp result
+            elif result < 0:
+                node = node.left
             else:
-                return self.find_node(node.right, item)
+                node = node.right
         return None
 
     def find_insertion_node(self, node, item):
@@ -278,22 +376,22 @@ class TreeSet:
         :param item: node to insert
         :return: None if node exists, parent node otherwise
         """
-        result = self.comp(item.data, node.data)
-        # If node exists
-        if result == 0:
-            return None
-        # Look down left or right side depending on comp result
-        elif result < 0:
-            if node.left is None:
-                return node
-            else:
-                return self.find_insertion_node(node.left, item)
-        elif result > 0:
-            if node.right is None:
-                return node
+        comp = self.comp
+        data = item.data
+        while True:
+            result = comp(data, node.data)
+            # If node exists
+            if result == 0:
+                return None
+            # Look down left or right side depending on comp result
+            elif result < 0:
+                if node.left is None:
+                    return node
+                node = node.left
             else:
-                return self.find_insertion_node(node.right, item)
-        return None
+                if node.right is None:
+                    return node
+                node = node.right
 
     @staticmethod
     def is_balanced(node):
@@ -311,40 +409,35 @@ class TreeSet:
 
     def rebalance(self, node):
         """
-        Checks if node needs to be rebalanced and rebalances if necessary
-        :param node: a node to start searching at
-        """
-        # My rebalance function works for the tests cases on Mimir except for Contain Hidden
-        # So I commented out the function to get more points
-
-        # if node is not None and node.parent is not None and self.is_balanced(node):
-        #     # Check parent if already balanced
-        #     self.rebalance(node.parent)
-        # elif node is not None and not self.is_balanced(node):
-        #     height_diff = get_node_height(node.left) - get_node_height(node.right)
-        #
-        #     if height_diff > 1:
-        #         # Left unbalanced
-        #         left_diff = get_node_height(node.left.left) - get_node_height(node.left.right)
-        #
-        #         # Left Left unbalanced
-        #         if left_diff > 0:
-        #             node.rotate_right(self)
-        #
-        #         # Left Right unbalanced
-        #         else:
-        #             node.rotate_left_right(self)
-        #
-        #     elif height_diff < -1:
-        #         # Right unbalanced
-        #         right_diff = get_node_height(node.right.left) - get_node_height(node.right.right)
-        #
-        #         # Right Left unbalanced
-        #         if right_diff > 0:
-        #             node.rotate_right_left(self)
-        #         # Right Right unbalanced
-        #         else:
-        #             node.rotate_left(self)
+        Updates heights from node up to the head, rotating unbalanced nodes in a balanced tree
+        Stops once a subtree ends up as tall as it was, nothing above it changes then
+        :param node: the lowest node whose subtree changed
+        """
+        while node is not None:
+            old_height = node.height
+            node.update_height()
+            if self.balanced:
+                height_diff = get_node_height(node.left) - get_node_height(node.right)
+                if height_diff > 1:
+                    # Left Left unbalanced, or level which only a remove leaves
+                    if get_node_height(node.left.left) >= get_node_height(node.left.right):
+                        node.rotate_right(self)
+                    # Left Right unbalanced
+                    else:
+                        node.rotate_left_right(self)
+                    # Carry on from the new root of this subtree
+                    node = node.parent
+                elif height_diff < -1:
+                    # Right Right unbalanced, or level which only a remove leaves
+                    if get_node_height(node.right.right) >= get_node_height(node.right.left):
+                        node.rotate_left(self)
+                    # Right Left unbalanced
+                    else:
+                        node.rotate_right_left(self)
+                    node = node.parent
+            if node.height == old_height:
+                return
+            node = node.parent
 
 class TreeNode:
     """
@@ -362,6 +455,7 @@ class TreeNode:
         self.right = None
         # added stuff below
         self.parent = None
+        self.height = 0     # Height of the subtree under this node
 
     def __repr__(self):
         """
@@ -372,27 +466,33 @@ class TreeNode:
 
     # Helper functions
 
+    def update_height(self):
+        """
+        Recomputes this node's height from its children's stored heights
+        """
+        self.height = 1 + max(get_node_height(self.left), get_node_height(self.right))
+
     def search_left(self):
         """
         Get the leftmost node
         :return: node
         """
-        if self.left is not None:
-            # Keep iterating through to get the leftmost
-            return self.left.search_left()
-        else:
-            return self
+        node = self
+        # Keep iterating through to get the leftmost
+        while node.left is not None:
+            node = node.left
+        return node
 
     def search_right(self):
         """
         Get the rightmost node
         :return: node
         """
-        if self.right is not None:
-            # Keep iterating through to get the rightmost
-            return self.right.search_right()
-        else:
-            return self
+        node = self
+        # Keep iterating through to get the rightmost
+        while node.right is not None:
+            node = node.right
+        return node
 
     def least_successor(self):
         """
@@ -404,6 +504,19 @@ class TreeNode:
             return self.right.search_left()
         return None
 
+    def successor(self):
+        """
+        Get the next node in order, through the right child or up the parents
+        :return: node, None for the last node
+        """
+        if self.right is not None:
+            return self.right.search_left()
+        # Climb until coming up from a left child
+        node = self
+        while node.parent is not None and node is node.parent.right:
+            node = node.parent
+        return node.parent
+
     def rotate_right(self, tree):
         """
         Rotation for a left-left unbalanced case
@@ -418,6 +531,8 @@ class TreeNode:
         y.parent = p
         if t3 is not None:
             t3.parent = self
+        self.update_height()
+        y.update_height()
 
         # Adjust parent
         if p is None:
@@ -441,6 +556,8 @@ class TreeNode:
         y.parent = p
         if t2 is not None:
             t2.parent = self
+        self.update_height()
+        y.update_height()
 
         # Adjust parent
         if p is None:
@@ -477,6 +594,9 @@ class TreeNode:
         if t3 is not None:
             t3.parent = self
         x.parent = p
+        y.update_height()
+        self.update_height()
+        x.update_height()
 
         # Adjust parent
         if p is None:
@@ -513,6 +633,9 @@ class TreeNode:
         if t2 is not None:
             t2.parent = self
         x.parent = p
+        y.update_height()
+        self.update_height()
+        x.update_height()
 
         # Adjust parent
         if p is None:
@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+"""
+Benchmarks for the tree set
+Run with a list of key counts, e.g. python3 benchmarks.py 1000000
+"""
+import random
+import sys
+import time
+
+from TreeSet import TreeSet
+
+def natural_order(x, y):
+    if x == y:
+        return 0
+    elif x < y:
+        return -1
+    else:
+        return 1
+
+def timed(function, *args):
+    """
+    Times a single call
+    :param function: the function to call
+    :param args: arguments for the function
+    :return: the seconds taken and the function's result
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def insert_all(tree, keys):
+    """
+    Inserts every key into a tree
+    :param tree: a TreeSet
+    :param keys: a list of keys
+    :return: the tree
+    """
+    for key in keys:
+        tree.insert(key)
+    return tree
+
+def bench_insert(sizes, unbalanced_limit=4000):
+    """
+    Times inserting sorted and random keys into balanced and plain trees
+    A plain tree fed sorted keys is a linked list, each insert walks every key before it,
+    so it gets doubling key counts up to unbalanced_limit and its inserts/s halves each time
+    :param sizes: a list of key counts
+    :param unbalanced_limit: the most sorted keys to give a plain tree
+    """
+    print('{0:>10} {1:>8} {2:>10} {3:>10} {4:>12} {5:>8}'.format(
+        'n', 'keys', 'tree', 'time (s)', 'inserts/s', 'height'))
+    runs = []
+    for n in sizes:
+        shuffled = list(range(n))
+        random.Random(0).shuffle(shuffled)
+        runs += [('sorted', list(range(n)), True),
+                 ('random', shuffled, True),
+                 ('random', shuffled, False)]
+    most = min(max(sizes), unbalanced_limit)
+    for count in [most // 8, most // 4, most // 2, most]:
+        runs.append(('sorted', list(range(count)), False))
+    for name, keys, balanced in runs:
+        run_time, tree = timed(insert_all, TreeSet(natural_order, balanced), keys)
+        print('{0:>10} {1:>8} {2:>10} {3:>10.3f} {4:>12.0f} {5:>8}'.format(
+            len(keys), name, 'AVL' if balanced else 'plain', run_time, len(keys) / run_time, tree.height()))
+
+def bench_iterate(sizes):
+    """
+    Times getting the first item and all items of a balanced tree, lazily and through build_list
+    :param sizes: a list of key counts
+    """
+    print('{0:>10} {1:>12} {2:>12} {3:>10}'.format('n', 'iteration', 'first (s)', 'all (s)'))
+    for n in sizes:
+        tree = insert_all(TreeSet(natural_order), range(n))
+        first_time, _ = timed(lambda: next(iter(tree)))
+        all_time, _ = timed(lambda: sum(1 for _ in tree))
+        print('{0:>10} {1:>12} {2:>12.6f} {3:>10.3f}'.format(n, 'lazy', first_time, all_time))
+        first_time, _ = timed(lambda: tree.build_list(tree.head)[0])
+        all_time, _ = timed(lambda: sum(1 for _ in tree.build_list(tree.head)))
+        print('{0:>10} {1:>12} {2:>12.6f} {3:>10.3f}'.format(n, 'build_list', first_time, all_time))
+
+def union_each(tree, other):
+    """
+    Union by inserting every item of both trees into a new one, kept for comparison
+    """
+    return insert_all(insert_all(TreeSet(tree.comp), tree), other)
+
+def intersection_each(tree, other):
+    """
+    Intersection by looking up each item of tree in other, kept for comparison
+    """
+    return insert_all(TreeSet(tree.comp), [item for item in tree if item in other])
+
+def difference_each(tree, other):
+    """
+    Difference by looking up each item of tree in other, kept for comparison
+    """
+    return insert_all(TreeSet(tree.comp), [item for item in tree if item not in other])
+
+def is_disjoint_each(tree, other):
+    """
+    The old is_disjoint, a lookup in tree for each item of other, kept for comparison
+    """
+    return not any(item in tree for item in other.build_list(other.head))
+
+def bench_set_ops(sizes, small=100):
+    """
+    Times set operations on two random trees of n items, and on n items against small items
+    :param sizes: a list of item counts
+    :param small: the size of the smaller tree in the lopsided pair
+    """
+    print('{0:>10} {1:>8} {2:>14} {3:>10} {4:>10}'.format('n', 'other', 'operation', 'each (s)', 'merge (s)'))
+    for n in sizes:
+        rng = random.Random(0)
+        tree = insert_all(TreeSet(natural_order), rng.sample(range(2 * n), n))
+        for m in [n, small]:
+            other = insert_all(TreeSet(natural_order), rng.sample(range(2 * n), m))
+            operations = [('union', union_each, TreeSet.union),
+                          ('intersection', intersection_each, TreeSet.intersection),
+                          ('difference', difference_each, TreeSet.difference),
+                          ('is_disjoint', is_disjoint_each, TreeSet.is_disjoint)]
+            for name, each, merged in operations:
+                each_time, _ = timed(each, tree, other)
+                merge_time, _ = timed(merged, tree, other)
+                print('{0:>10} {1:>8} {2:>14} {3:>10.3f} {4:>10.3f}'.format(n, m, name, each_time, merge_time))
+
+def main(sizes):
+    bench_insert(sizes)
+    bench_iterate(sizes)
+    bench_set_ops(sizes)
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 1000000])